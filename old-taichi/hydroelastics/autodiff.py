@@ -0,0 +1,442 @@
+"""
+Contact forces that Taichi can differentiate, for gradient-based fitting of
+potentials and poses.
+
+The contact polygon of a tet pair is the part of its equipressure plane inside
+both tets, so each vertex is where that plane meets two of the eight faces of
+the tets. `DiffContact.update()` runs the usual clipping kernels once to find
+which faces those are. The differentiable pass then rebuilds every vertex by
+intersecting the three planes, and integrates pressure over the polygons in
+kernels that follow Taichi's autodiff rules. A single backward pass through
+`Tape` then gives the gradient of the total force with respect to all vertex
+potentials and both poses. The gradient holds as long as the set of faces
+bounding each polygon stays the same, which is true almost everywhere.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import taichi as ti
+
+from . import profiling
+from .bvh import candidate_pairs
+from .contact import MAX_POLYGON_VERTS, get_workspace
+from .forces import ForceResult
+from .object import pressure_equations, transform_points
+from .precision import wider
+from .runtime import init
+
+# `ti.Tape` moved to `ti.ad.Tape` in later versions of Taichi.
+Tape = getattr(getattr(ti, "ad", None), "Tape", None) or ti.Tape
+
+
+class ContactGradients(NamedTuple):
+    """Gradients of a weighted sum of the contact wrench."""
+
+    value: float  # The weighted sum itself.
+    potentials_a: np.ndarray  # With respect to each vertex potential of A.
+    potentials_b: np.ndarray  # With respect to each vertex potential of B.
+    pose_a: np.ndarray  # With respect to each entry of the 4x4 pose of A.
+    pose_b: np.ndarray  # With respect to each entry of the 4x4 pose of B.
+
+
+@ti.data_oriented
+class DiffContact:
+    """
+    Differentiable contact between objects A and B.
+
+    Vertex potentials and poses live in fields with gradients, starting from
+    the meshes and poses of the objects. Call `update()` after changing them
+    by more than a small step, so that the polygon faces are found again.
+    """
+
+    def __init__(self, a, b):
+        init()
+        self.a, self.b = a, b
+        self.dtype = wider(a.precision, b.precision).compute
+        self.dtype_np = np.float64 if self.dtype == ti.f64 else np.float32
+        self.potentials_a = ti.field(self.dtype, shape=(a.n_vert,), needs_grad=True)
+        self.potentials_b = ti.field(self.dtype, shape=(b.n_vert,), needs_grad=True)
+        self.poses = ti.Matrix.field(4, 4, self.dtype, shape=(2,), needs_grad=True)
+        self.coms = ti.Vector.field(3, self.dtype, shape=(2,))
+        # Net force on A, torque on A and torque on B.
+        self.wrench = ti.Vector.field(3, self.dtype, shape=(3,), needs_grad=True)
+        self.weights = ti.Vector.field(3, self.dtype, shape=(3,))
+        self.loss = ti.field(self.dtype, shape=(), needs_grad=True)
+
+        self.potentials_a.from_numpy(a.mesh.potentials_np.astype(self.dtype_np))
+        self.potentials_b.from_numpy(b.mesh.potentials_np.astype(self.dtype_np))
+        self.coms.from_numpy(np.array([a.com, b.com], dtype=self.dtype_np))
+        self.set_poses(a.pose_np, b.pose_np)
+        self.capacity = 0
+        self.n = 0
+
+    def set_poses(self, pose_a=None, pose_b=None):
+        poses = self.poses.to_numpy() if pose_a is None or pose_b is None else None
+        pose_a = poses[0] if pose_a is None else pose_a
+        pose_b = poses[1] if pose_b is None else pose_b
+        self.poses.from_numpy(np.array([pose_a, pose_b], dtype=self.dtype_np))
+
+    def set_potentials(self, potentials_a=None, potentials_b=None):
+        if potentials_a is not None:
+            self.potentials_a.from_numpy(np.asarray(potentials_a, self.dtype_np))
+        if potentials_b is not None:
+            self.potentials_b.from_numpy(np.asarray(potentials_b, self.dtype_np))
+
+    def allocate(self, n: int):
+        """Make room for at least `n` tet pairs."""
+        if n <= self.capacity:
+            return
+        capacity = max(self.capacity, 64)
+        while capacity < n:
+            capacity *= 2
+        self.capacity = capacity
+        real = self.dtype
+        self.tets = ti.Vector.field(4, ti.i32, shape=(capacity, 2))
+        self.body = ti.Vector.field(3, real, shape=(capacity, 2, 4))
+        # Maps the potentials at the corners of a tet to its linear potential.
+        self.inverses = ti.Matrix.field(4, 4, real, shape=(capacity, 2))
+        # Orientation of each face normal, so that it points into the tet.
+        self.signs = ti.Vector.field(4, real, shape=(capacity, 2))
+        self.labels = ti.field(ti.i32, shape=(capacity, MAX_POLYGON_VERTS))
+        self.counts = ti.field(ti.i32, shape=(capacity,))
+
+        def field(n, *shape):
+            return ti.Vector.field(n, real, shape=(capacity, *shape), needs_grad=True)
+
+        self.coords = field(3, 2, 4)
+        self.equations = field(4, 2)
+        self.faces = field(4, 8)  # faces of A, then faces of B
+        self.planes = field(4)
+        self.points = field(3, MAX_POLYGON_VERTS)
+
+    def update(self, pairs=None):
+        """
+        Find the faces bounding each contact polygon at the current potentials
+        and poses. By default the tet pairs come from the bounding volume
+        hierarchies; pass an (N, 2) array of (tet in A, tet in B) instead.
+        """
+        a, b = self.a, self.b
+        if pairs is None:
+            pairs = candidate_pairs(a, b)
+        pairs = np.asarray(pairs, dtype=np.int32).reshape(-1, 2)
+        with profiling.stage("topology"):
+            poses = self.poses.to_numpy().astype(np.float64)
+            tets, body, equations = [], [], []
+            for obj, field, idx in [
+                (a, self.potentials_a, pairs[:, 0]),
+                (b, self.potentials_b, pairs[:, 1]),
+            ]:
+                mesh = obj.mesh
+                tets.append(mesh.tets_np[idx])
+                body.append(mesh.vertices_np[tets[-1]].astype(np.float64))
+                equations.append(
+                    pressure_equations(mesh.vertices_np, field.to_numpy(), tets[-1])
+                )
+            polygons, counts = self._clip(body, equations, poses)
+            labels, counts = _face_labels(
+                [transform_points(p, c) for p, c in zip(poses, body)],
+                polygons,
+                counts,
+                rtol=1e3 * np.finfo(self.dtype_np).eps,
+            )
+
+        keep = counts >= 3
+        n = self.n = int(np.count_nonzero(keep))
+        self.pairs = pairs[keep]
+        if n == 0:
+            return
+        self.allocate(n)
+        body = np.stack([c[keep] for c in body], axis=1)  # (n, 2, 4, 3)
+        self.tets.from_numpy(_pad(np.stack([t[keep] for t in tets], 1), self.capacity))
+        self.body.from_numpy(_pad(body, self.capacity, self.dtype_np))
+        self.inverses.from_numpy(
+            _pad(_potential_inverses(body), self.capacity, self.dtype_np)
+        )
+        self.signs.from_numpy(_pad(_face_signs(body), self.capacity, self.dtype_np))
+        self.labels.from_numpy(_pad(labels[keep], self.capacity))
+        self.counts.from_numpy(_pad(counts[keep], self.capacity))
+
+    def _clip(self, body, equations, poses):
+        n = len(body[0])
+        if n == 0:
+            return np.zeros((0, MAX_POLYGON_VERTS, 3)), np.zeros(0, dtype=np.int32)
+        ws = get_workspace(n, self.dtype)
+        ws.load(body[0], equations[0], body[1], equations[1])
+        ws.poses.from_numpy(poses.astype(ws.dtype_np))
+        ws.run(n)
+        polygons = ws.polygons.to_numpy()[:n, 0].astype(np.float64)
+        return polygons, ws.counts.to_numpy()[:n]
+
+    @ti.func
+    def rotation(self, k: ti.template()):
+        pose = self.poses[k]
+        return ti.Matrix(
+            [
+                [pose[0, 0], pose[0, 1], pose[0, 2]],
+                [pose[1, 0], pose[1, 1], pose[1, 2]],
+                [pose[2, 0], pose[2, 1], pose[2, 2]],
+            ]
+        )
+
+    @ti.func
+    def translation(self, k: ti.template()):
+        pose = self.poses[k]
+        return ti.Vector([pose[0, 3], pose[1, 3], pose[2, 3]])
+
+    @ti.func
+    def to_world(self, i, k: ti.template(), potentials: ti.template()):
+        """Move the tet and linear potential of side k of pair i by pose k."""
+        rot, t = self.rotation(k), self.translation(k)
+        for j in ti.static(range(4)):
+            self.coords[i, k, j] = rot @ self.body[i, k, j] + t
+        tet = self.tets[i, k]
+        pots = ti.Vector(
+            [
+                potentials[tet[0]],
+                potentials[tet[1]],
+                potentials[tet[2]],
+                potentials[tet[3]],
+            ]
+        )
+        e = self.inverses[i, k] @ pots
+        # Written out, as a matmul here trips "loading variable before anything
+        # is stored" warnings when Taichi compiles the reverse pass.
+        g = ti.Vector(
+            [
+                rot[r, 0] * e[0] + rot[r, 1] * e[1] + rot[r, 2] * e[2]
+                for r in ti.static(range(3))
+            ]
+        )
+        self.equations[i, k] = ti.Vector([g[0], g[1], g[2], e[3] - g.dot(t)])
+
+    @ti.kernel
+    def transform(self, n: ti.i32):
+        """Move tets and their linear potentials to the world frame."""
+        for i in range(n):
+            self.to_world(i, 0, self.potentials_a)
+            self.to_world(i, 1, self.potentials_b)
+
+    @ti.kernel
+    def find_planes(self, n: ti.i32):
+        """Fill in the equipressure plane and the inward face planes of each pair."""
+        for i in range(n):
+            self.planes[i] = self.equations[i, 0] - self.equations[i, 1]
+            for k in ti.static(range(2)):
+                for f in ti.static(range(4)):
+                    a = self.coords[i, k, (f + 1) % 4]
+                    normal = (self.coords[i, k, (f + 2) % 4] - a).cross(
+                        self.coords[i, k, (f + 3) % 4] - a
+                    ) * self.signs[i, k][f]
+                    self.faces[i, 4 * k + f] = ti.Vector(
+                        [normal[0], normal[1], normal[2], -normal.dot(a)]
+                    )
+
+    @ti.kernel
+    def find_points(self, n: ti.i32):
+        """Intersect the equipressure plane with the faces around each vertex."""
+        for i in range(n):
+            cnt = self.counts[i]
+            plane = self.planes[i]
+            for v in ti.static(range(MAX_POLYGON_VERTS)):
+                if v < cnt:
+                    f = self.faces[i, self.labels[i, (v + cnt - 1) % cnt]]
+                    g = self.faces[i, self.labels[i, v]]
+                    m = ti.Matrix(
+                        [
+                            [plane[0], plane[1], plane[2]],
+                            [f[0], f[1], f[2]],
+                            [g[0], g[1], g[2]],
+                        ]
+                    )
+                    rhs = ti.Vector([plane[3], f[3], g[3]])
+                    self.points[i, v] = -(m.inverse() @ rhs)
+
+    @ti.kernel
+    def integrate(self, n: ti.i32):
+        """Sum pressure x area x normal over the polygons into `wrench`."""
+        for i in range(n):
+            com_a = self.rotation(0) @ self.coms[0] + self.translation(0)
+            com_b = self.rotation(1) @ self.coms[1] + self.translation(1)
+            force = ti.Vector.zero(self.dtype, 3)
+            center = ti.Vector.zero(self.dtype, 3)
+            cnt = self.counts[i]
+            eq = self.equations[i, 0]
+            grad = ti.Vector([eq[0], eq[1], eq[2]])
+            p0 = self.points[i, 0]
+            total, area = ti.cast(0.0, self.dtype), ti.cast(0.0, self.dtype)
+            moment = ti.Vector.zero(self.dtype, 3)
+            for v in ti.static(range(2, MAX_POLYGON_VERTS)):
+                if v < cnt:
+                    p1, p2 = self.points[i, v - 1], self.points[i, v]
+                    tri_area = 0.5 * (p1 - p0).cross(p2 - p0).norm()
+                    tri_center = (p0 + p1 + p2) / 3
+                    total += (grad.dot(tri_center) + eq[3]) * tri_area
+                    area += tri_area
+                    moment += tri_area * tri_center
+            if area >= 1e-9:
+                plane = self.planes[i]
+                normal = ti.Vector([plane[0], plane[1], plane[2]]).normalized()
+                if normal.dot(com_a - com_b) < 0:
+                    normal = -normal
+                force = total * normal
+                center = moment / area
+            self.wrench[0] += force
+            self.wrench[1] += (center - com_a).cross(force)
+            self.wrench[2] += (center - com_b).cross(-force)
+
+    @ti.kernel
+    def clear(self):
+        for k in ti.static(range(3)):
+            self.wrench[k] = ti.Vector.zero(self.dtype, 3)
+
+    @ti.kernel
+    def weigh(self):
+        for k in ti.static(range(3)):
+            self.loss[None] += self.weights[k].dot(self.wrench[k])
+
+    def forward(self):
+        """Evaluate the wrench from the fields, in a form that can be taped."""
+        self.clear()
+        self.loss[None] = 0
+        if self.n > 0:
+            self.transform(self.n)
+            self.find_planes(self.n)
+            self.find_points(self.n)
+            self.integrate(self.n)
+        self.weigh()
+
+    def compute_force(self) -> ForceResult:
+        """The contact forces and torques, as in `forces.compute_force()`."""
+        self.forward()
+        force, tau_AB, tau_BA = self.wrench.to_numpy().astype(np.float64)
+        return ForceResult(force, -force, tau_AB, tau_BA)
+
+    def gradients(self, weights) -> ContactGradients:
+        """
+        Gradients of the sum of `weights` times the wrench, in one backward
+        pass. `weights` is a 3-vector for the force on A, or a 3x3 array whose
+        rows go with the force on A, the torque on A and the torque on B.
+        """
+        weights = np.atleast_2d(weights)
+        w = np.zeros((3, 3))
+        w[: len(weights)] = weights
+        self.weights.from_numpy(w.astype(self.dtype_np))
+        with profiling.stage("backward"):
+            with Tape(loss=self.loss):
+                self.forward()
+        poses = self.poses.grad.to_numpy().astype(np.float64)
+        return ContactGradients(
+            float(self.loss[None]),
+            self.potentials_a.grad.to_numpy().astype(np.float64),
+            self.potentials_b.grad.to_numpy().astype(np.float64),
+            poses[0],
+            poses[1],
+        )
+
+
+def twist_gradient(pose, grad):
+    """
+    Turn the gradient with respect to the entries of a 4x4 rigid `pose` into
+    gradients with respect to a world-frame rotation vector and translation
+    applied on top of it, as (d/d omega, d/d v).
+    """
+    pose, grad = np.asarray(pose, np.float64), np.asarray(grad, np.float64)
+    d_v = grad[:3, 3]
+    d_omega = np.zeros(3)
+    for k in range(3):
+        skew = np.cross(np.eye(3), np.eye(3)[k])  # skew @ x = e_k x x
+        d_omega[k] = np.sum(grad[:3, :] * (skew @ pose[:3, :]))
+    return d_omega, d_v
+
+
+def _pad(arr, capacity: int, dtype=None):
+    out = np.zeros((capacity,) + arr.shape[1:], dtype=dtype or arr.dtype)
+    out[: len(arr)] = arr
+    return out
+
+
+def _potential_inverses(body):
+    """
+    Matrices taking the corner potentials of tets with (..., 4, 3) corners to
+    their linear potentials (gx, gy, gz, d); zero for degenerate tets.
+    """
+    rows = np.concatenate((body, np.ones(body.shape[:-1] + (1,))), axis=-1)
+    edges = body[..., 1:, :] - body[..., :1, :]
+    valid = np.abs(np.linalg.det(edges)) > 1e-12
+    out = np.zeros(rows.shape)
+    out[valid] = np.linalg.inv(rows[valid])
+    return out
+
+
+def _face_normals(coords):
+    """Normals of the faces opposite each corner of (..., 4, 3) tets, and a point on each."""
+    points = np.stack([coords[..., (k + 1) % 4, :] for k in range(4)], axis=-2)
+    normals = np.stack(
+        [
+            np.cross(
+                coords[..., (k + 2) % 4, :] - points[..., k, :],
+                coords[..., (k + 3) % 4, :] - points[..., k, :],
+            )
+            for k in range(4)
+        ],
+        axis=-2,
+    )
+    return normals, points
+
+
+def _face_signs(coords):
+    """Signs that turn the face normals of `_face_normals` into the tets."""
+    normals, points = _face_normals(coords)
+    side = np.einsum("...i,...i->...", normals, coords - points)
+    return np.where(side < 0, -1.0, 1.0)
+
+
+def _face_planes(coords):
+    """
+    Inward planes (n, d) with n . x + d >= 0 inside of face k, the one opposite
+    corner k, of tets with (..., 4, 3) corners, as a (..., 4, 4) array.
+    """
+    normals, points = _face_normals(coords)
+    normals *= _face_signs(coords)[..., None]
+    offsets = -np.einsum("...i,...i->...", normals, points)
+    return np.concatenate((normals, offsets[..., None]), axis=-1)
+
+
+def _face_labels(coords, polygons, counts, rtol: float):
+    """
+    Find the face, out of the 4 faces of tet A then the 4 of tet B, that each
+    polygon edge lies on, where edge v runs from vertex v to the next one.
+    Vertices between two edges on the same face, or in the middle of a straight
+    run of edges to within `rtol`, are dropped. Returns the labels of the
+    remaining edges with the new vertex counts.
+    """
+    n, m = polygons.shape[:2]
+    counts = np.asarray(counts, dtype=np.int64)
+    planes = np.concatenate([_face_planes(c) for c in coords], axis=1)  # (n, 8, 4)
+    planes /= np.maximum(
+        np.linalg.norm(planes[..., :3], axis=-1, keepdims=True), 1e-300
+    )
+    dist = np.abs(
+        np.einsum("nmi,nfi->nmf", polygons, planes[..., :3]) + planes[:, None, :, 3]
+    )  # (n, m, 8)
+    rows = np.arange(n)[:, None]
+    v = np.arange(m)[None, :]
+    valid = v < counts[:, None]
+    nxt = (v + 1) % np.maximum(counts, 1)[:, None]
+    dist = np.maximum(dist, dist[rows, nxt])
+    labels = np.argmin(dist, axis=-1)
+    # Straight runs cross several faces along one line; give them all the
+    # first face so the vertices in between are dropped.
+    tol = rtol * (1 + np.abs(polygons).max(axis=(1, 2), initial=0))
+    prev = (v - 1) % np.maximum(counts, 1)[:, None]
+    for k in list(range(m)) * 2:  # twice, for runs that wrap around
+        last = labels[rows[:, 0], prev[:, k]]
+        straight = dist[rows[:, 0], k, last] <= tol
+        labels[:, k] = np.where(straight & valid[:, k], last, labels[:, k])
+    keep = valid & (labels != labels[rows, prev])
+    order = np.argsort(~keep, axis=1, kind="stable")
+    labels = np.take_along_axis(labels, order, axis=1)
+    counts = keep.sum(axis=1)
+    labels[v >= counts[:, None]] = 0
+    return labels.astype(np.int32), counts.astype(np.int32)
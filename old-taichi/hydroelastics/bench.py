@@ -0,0 +1,169 @@
+"""Benchmarks for the contact pipeline, recorded as JSON to track regressions."""
+
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+import numpy as np
+import taichi as ti
+
+from .contact import intersect_batch
+from .bvh import candidate_pairs
+from .forces import compute_force
+from .precision import get_precision, set_precision
+from .profiling import Profiler, profile
+from .runtime import current_arch, init
+from .object import (
+    Object,
+    center_of_mass,
+    intersect,
+    pressure,
+    triangulate_polygon,
+    triangulate_polygons,
+)
+from .shapes import make_box, make_cube, make_icosphere
+
+# Same two tets as the "Tet force" benchmark of the Julia package.
+TET1 = dict(
+    verts=[(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)],
+    potentials=[0.0, 0.0, 0.0, 1.0],
+    tets=[(0, 1, 2, 3)],
+)
+TET2 = dict(
+    verts=[(0.0, 0.0, 1.8), (1.0, 0.0, 1.8), (0.0, 1.0, 1.8), (0.0, 0.0, 0.8)],
+    potentials=[0.0, 0.0, 0.0, 1.0],
+    tets=[(0, 1, 2, 3)],
+)
+HEXAGON = np.array(
+    [(1.0, -2, 0), (3, -2, 1), (-3, -5, 4), (1, -4, 4), (3, -1, -1), (-3, -6, 6)]
+)
+
+
+def cases(max_order: int):
+    """
+    Yield (name, params, function) for every benchmark case. Cases are meant to
+    be timed as they are generated, since later shapes rebind the closures.
+    """
+    tet1, tet2 = Object(**TET1), Object(**TET2)
+    yield "object_construction", {"shape": "tet"}, lambda: Object(**TET1)
+    yield "intersect", {"shape": "tet"}, lambda: intersect(tet1, tet2, 0, 0)
+    yield "pressure", {"shape": "tet"}, lambda: pressure(tet1, tet2, 0, 0)
+    yield "compute_force", {"shape": "tet"}, lambda: compute_force(tet1, tet2)
+    yield "triangulate_polygon", {"n_verts": 6}, lambda: triangulate_polygon(HEXAGON)
+    hexagons = np.broadcast_to(HEXAGON, (1024,) + HEXAGON.shape)
+    params = {"n_verts": 6, "n_polygons": len(hexagons)}
+    yield "triangulate_polygons", params, lambda: triangulate_polygons(hexagons)
+
+    shapes = [("cube", {}, make_cube)]
+    for order in range(max_order + 1):
+        shapes.append(("icosphere", {"order": order}, partial(make_icosphere, order)))
+    for resolution in (2**k for k in range(1, max_order + 2)):
+        make = partial(make_box, resolution=resolution)
+        shapes.append(("box", {"resolution": resolution}, make))
+
+    for shape, params, make in shapes:
+        params = {"shape": shape, **params}
+        a, b = make(), make()
+        # Two overlapping copies, as in the Julia "Icosphere force" benchmark.
+        a.translate([0.031, -0.5, 0.052])
+        b.translate([0.0, 0.5, 0.0])
+        verts, tets = a.mesh.vertices_np, a.mesh.tets_np
+        pairs = candidate_pairs(a, b)
+        params.update(n_tets=a.n_tets, n_pairs=len(pairs))
+
+        yield "object_construction", params, make
+        yield "center_of_mass", params, lambda: center_of_mass(verts, tets)
+        yield "candidate_pairs", params, lambda: candidate_pairs(a, b)
+        yield "intersect_batch", params, lambda: intersect_batch(a, b, pairs)
+        yield "compute_force", params, lambda: compute_force(a, b)
+
+
+def measure(fn, repeat: int, min_time: float):
+    """Time `fn`, calling it in loops of at least `min_time` seconds."""
+    fn()  # warm up, including any kernel compilation
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "number": number,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "times": times,
+    }
+
+
+def run(
+    out,
+    repeat: int = 5,
+    max_order: int = 2,
+    min_time: float = 0.05,
+    trace=None,
+    precisions=None,
+):
+    """
+    Run all benchmarks, print a summary and write the results to `out`. Every
+    case is run once for each of the precision policies in `precisions`, by
+    default only the one the runtime was configured with. With
+    `trace`, every case is also run once more under the profiler, and the
+    stages are written to that path as a Chrome trace.
+    """
+    config = init()
+    precisions = list(precisions or [config.precision])
+    results = []
+    profiler = Profiler(sync=True)
+    default = get_precision()
+    try:
+        for precision in precisions:
+            set_precision(precision)
+            for name, params, fn in cases(max_order):
+                params = {**params, "precision": precision}
+                stats = measure(fn, repeat, min_time)
+                if trace is not None:
+                    with profile(profiler), profiler.stage(name):
+                        fn()
+                results.append({"name": name, "params": params, **stats})
+                label = ", ".join(f"{k}={v}" for k, v in params.items())
+                print(f"{name}[{label}]: {stats['median'] * 1e6:.1f} us")
+    finally:
+        set_precision(default)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "numpy": np.__version__,
+            "taichi": ".".join(map(str, ti.__version__)),
+            "arch": current_arch(),
+        },
+        "runtime": config._asdict(),
+        "config": {
+            "repeat": repeat,
+            "max_order": max_order,
+            "min_time": min_time,
+            "precisions": list(precisions),
+        },
+        "results": results,
+    }
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    if trace is not None:
+        profiler.save_chrome_trace(trace)
+    return report
@@ -0,0 +1,59 @@
+import numpy as np
+
+
+class SweepAndPrune:
+    """
+    Scene-level broad phase over the world bounding boxes of many objects.
+
+    Boxes are swept along the axis where their centers are most spread out.
+    The sorted order from the previous call is kept and re-sorted with a
+    stable sort, which runs in near-linear time when objects move a little
+    between steps. After each `update`, `pairs` holds the (P, 2) array of
+    overlapping object indices (i < j), while `added` and `removed` hold the
+    pairs that started or stopped overlapping since the previous update.
+    """
+
+    def __init__(self):
+        self.order = np.zeros(0, dtype=np.int64)
+        self.axis = -1
+        self.pairs = np.zeros((0, 2), dtype=np.int64)
+        self.added = self.pairs
+        self.removed = self.pairs
+
+    def update(self, lo, hi):
+        """Update the broad phase with new (n, 3) bounds; returns `pairs`."""
+        lo = np.asarray(lo, dtype=np.float64).reshape(-1, 3)
+        hi = np.asarray(hi, dtype=np.float64).reshape(-1, 3)
+        n = len(lo)
+
+        axis = int(np.argmax(np.var(lo + hi, axis=0))) if n else 0
+        if axis != self.axis or len(self.order) != n:
+            self.axis = axis
+            self.order = np.arange(n)
+        order = self.order[np.argsort(lo[self.order, axis], kind="stable")]
+        self.order = order
+
+        # Every box whose start lies within [lo, hi] of a box earlier in the
+        # sweep overlaps it along the axis.
+        start = lo[order, axis]
+        end = np.searchsorted(start, hi[order, axis], side="right")
+        counts = np.maximum(end - np.arange(n) - 1, 0)
+        first = np.repeat(np.arange(n), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        second = first + 1 + offsets
+        i, j = order[first], order[second]
+        keep = np.all((lo[i] <= hi[j]) & (lo[j] <= hi[i]), axis=1)
+        pairs = np.sort(np.stack([i[keep], j[keep]], axis=1), axis=1)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+        old, new = _keys(self.pairs), _keys(pairs)
+        self.added = pairs[~np.isin(new, old)]
+        self.removed = self.pairs[~np.isin(old, new)]
+        self.pairs = pairs
+        return pairs
+
+
+def _keys(pairs):
+    return pairs[:, 0] << 32 | pairs[:, 1]
@@ -0,0 +1,177 @@
+from functools import lru_cache
+
+import numpy as np
+
+LEAF_SIZE = 4
+
+
+def tet_bounds(verts, tets):
+    """Compute the (lo, hi) axis-aligned bounding boxes of every tet."""
+    tets = np.asarray(tets, dtype=np.int64).reshape(-1, 4)
+    coords = np.asarray(verts, dtype=np.float64).reshape(-1, 3)[tets]  # (n, 4, 3)
+    return coords.min(axis=1), coords.max(axis=1)
+
+
+class TetBVH:
+    """
+    Axis-aligned bounding box tree over the tets of a mesh.
+
+    Nodes are stored as flat arrays in preorder, so every child has a larger
+    index than its parent. Leaves hold up to `LEAF_SIZE` tet indices in
+    `items`, padded with -1; internal nodes have -1 in `items` and two entries
+    in `children`.
+    """
+
+    # Arrays that fully describe a built tree, see `from_arrays`.
+    ARRAYS = ("children", "items", "depth", "lo", "hi", "tet_lo", "tet_hi")
+
+    def __init__(self, verts, tets):
+        lo, hi = tet_bounds(verts, tets)
+        n = len(lo)
+        centers = (lo + hi) / 2
+        n_nodes = _subtree_size(n)
+        self.children = np.full((n_nodes, 2), -1, dtype=np.int64)
+        self.items = np.full((n_nodes, LEAF_SIZE), -1, dtype=np.int64)
+        self.depth = np.zeros(n_nodes, dtype=np.int64)
+        # Each stack entry is (node index, tet indices in the node, depth).
+        stack = [(0, np.arange(n), 0)]
+        while stack:
+            node, idx, d = stack.pop()
+            self.depth[node] = d
+            if len(idx) <= LEAF_SIZE:
+                self.items[node, : len(idx)] = idx
+                continue
+            # Median split along the longest axis of the centroid bounds.
+            c = centers[idx]
+            axis = np.argmax(c.max(axis=0) - c.min(axis=0))
+            half = len(idx) // 2
+            order = np.argpartition(c[:, axis], half)
+            left, right = idx[order[:half]], idx[order[half:]]
+            # Reserve the whole left subtree before numbering the right child.
+            left_id = node + 1
+            right_id = left_id + _subtree_size(len(left))
+            self.children[node] = (left_id, right_id)
+            stack.append((right_id, right, d + 1))
+            stack.append((left_id, left, d + 1))
+
+        self.n_tets = n
+        self._fit(lo, hi)
+
+    def _fit(self, lo, hi):
+        """Compute all node bounds bottom-up from the tet bounds."""
+        self.tet_lo, self.tet_hi = lo, hi
+        n_nodes = len(self.children)
+        self.lo = np.full((n_nodes, 3), np.inf)
+        self.hi = np.full((n_nodes, 3), -np.inf)
+
+        if len(lo) == 0:
+            return
+
+        valid = (self.items >= 0)[..., None]
+        self.lo[:] = np.where(valid, lo[self.items], np.inf).min(axis=1)
+        self.hi[:] = np.where(valid, hi[self.items], -np.inf).max(axis=1)
+
+        internal = self.children[:, 0] >= 0
+        for d in range(self.depth.max(initial=0), -1, -1):
+            nodes = np.nonzero(internal & (self.depth == d))[0]
+            left, right = self.children[nodes, 0], self.children[nodes, 1]
+            self.lo[nodes] = np.minimum(self.lo[left], self.lo[right])
+            self.hi[nodes] = np.maximum(self.hi[left], self.hi[right])
+
+    @classmethod
+    def from_arrays(cls, children, items, depth, lo, hi, tet_lo, tet_hi):
+        """Wrap the arrays of an already built tree, e.g. read from a file."""
+        bvh = cls.__new__(cls)
+        bvh.children, bvh.items, bvh.depth = children, items, depth
+        bvh.lo, bvh.hi = lo, hi
+        bvh.tet_lo, bvh.tet_hi = tet_lo, tet_hi
+        bvh.n_tets = len(tet_lo)
+        return bvh
+
+    def is_leaf(self, nodes):
+        return self.children[nodes, 0] < 0
+
+
+@lru_cache(maxsize=None)
+def _subtree_size(n: int) -> int:
+    """Number of nodes in the tree built over `n` tets."""
+    if n <= LEAF_SIZE:
+        return 1
+    half = n // 2
+    return 1 + _subtree_size(half) + _subtree_size(n - half)
+
+
+def _overlaps(lo_a, hi_a, lo_b, hi_b):
+    return np.all((lo_a <= hi_b) & (lo_b <= hi_a), axis=-1)
+
+
+def transform_boxes(lo, hi, pose):
+    """
+    Conservative axis-aligned bounds of boxes (lo, hi) after a 4x4 transform.
+    """
+    center, half = (lo + hi) / 2, (hi - lo) / 2
+    center = center @ pose[:3, :3].T + pose[:3, 3]
+    half = half @ np.abs(pose[:3, :3]).T
+    return center - half, center + half
+
+
+def candidate_pairs(a, b, margin: float = 0.0):
+    """
+    Return all pairs of tets from objects A, B whose bounding boxes overlap,
+    after growing the boxes of B by `margin` on every side.
+
+    The result is an (N, 2) int32 array of (tet index in A, tet index in B),
+    found by descending both trees at once, one level per vectorized step. The
+    trees stay in body coordinates: boxes of A are mapped into the frame of B
+    as they are visited, so a pose change needs no refit.
+    """
+    ta, tb = a.bvh, b.bvh
+    if ta.n_tets == 0 or tb.n_tets == 0:
+        return np.zeros((0, 2), dtype=np.int32)
+
+    relative = np.linalg.solve(b.pose_np, a.pose_np)  # frame of A, seen from B
+
+    def boxes_a(lo, hi):
+        return transform_boxes(lo, hi, relative)
+
+    na, nb = np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
+    leaves_a, leaves_b = [], []
+    while len(na):
+        keep = _overlaps(
+            *boxes_a(ta.lo[na], ta.hi[na]), tb.lo[nb] - margin, tb.hi[nb] + margin
+        )
+        na, nb = na[keep], nb[keep]
+        leaf_a, leaf_b = ta.is_leaf(na), tb.is_leaf(nb)
+        done = leaf_a & leaf_b
+        leaves_a.append(na[done])
+        leaves_b.append(nb[done])
+
+        # Descend into A when it is internal and at least as shallow as B.
+        split_a = ~leaf_a & (leaf_b | (ta.depth[na] <= tb.depth[nb]))
+        split_b = ~done & ~split_a
+        na = np.concatenate(
+            [ta.children[na[split_a]].ravel(), np.repeat(na[split_b], 2)]
+        )
+        nb = np.concatenate(
+            [np.repeat(nb[split_a], 2), tb.children[nb[split_b]].ravel()]
+        )
+
+    items_a = ta.items[np.concatenate(leaves_a)]  # (L, LEAF_SIZE)
+    items_b = tb.items[np.concatenate(leaves_b)]
+    ia = np.broadcast_to(items_a[:, :, None], items_a.shape + (LEAF_SIZE,)).ravel()
+    ib = np.broadcast_to(items_b[:, None, :], items_a.shape + (LEAF_SIZE,)).ravel()
+    keep = (ia >= 0) & (ib >= 0)
+    return overlapping_pairs(a, b, np.stack([ia[keep], ib[keep]], axis=1), margin)
+
+
+def overlapping_pairs(a, b, pairs, margin: float = 0.0):
+    """
+    Keep the (tet in A, tet in B) pairs whose posed bounding boxes overlap, with
+    the boxes of B grown by `margin`.
+    """
+    ia, ib = pairs[:, 0], pairs[:, 1]
+    relative = np.linalg.solve(b.pose_np, a.pose_np)
+    lo_a, hi_a = transform_boxes(a.bvh.tet_lo[ia], a.bvh.tet_hi[ia], relative)
+    lo_b, hi_b = b.bvh.tet_lo[ib] - margin, b.bvh.tet_hi[ib] + margin
+    keep = _overlaps(lo_a, hi_a, lo_b, hi_b)
+    return pairs[keep].astype(np.int32)
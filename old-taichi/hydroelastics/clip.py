@@ -0,0 +1,124 @@
+import taichi as ti
+import numpy as np
+
+
+@ti.func
+def clip_halfspace(
+    polygons: ti.template(),
+    i,
+    cnt,
+    src: ti.template(),
+    dst: ti.template(),
+    normal,
+    origin,
+):
+    """
+    One Sutherland-Hodgman step inside a kernel: clip the convex polygon stored
+    in `polygons[i, src, :cnt]` to the side of the plane through `origin` where
+    `normal . (x - origin) >= 0`, writing it to `polygons[i, dst, :]`.
+
+    Returns the number of vertices written. Vertices lying exactly on the plane
+    are kept once, and edges parallel to the plane never create new points.
+    """
+    max_verts = ti.static(polygons.shape[2])
+    out = 0
+    for v in range(cnt):
+        p = polygons[i, src, v]
+        q = polygons[i, src, (v + 1) % cnt]
+        dp, dq = normal.dot(p - origin), normal.dot(q - origin)
+        if dp >= 0 and out < max_verts:
+            polygons[i, dst, out] = p
+            out += 1
+        if ((dp > 0 and dq < 0) or (dp < 0 and dq > 0)) and out < max_verts:
+            polygons[i, dst, out] = p + dp / (dp - dq) * (q - p)
+            out += 1
+    return out
+
+
+def clip_polygons(polygons, counts, planes):
+    """
+    Clip a batch of convex polygons by one half-space each, in numpy.
+
+    `polygons` is a padded (P, M, d) array whose row `k` holds `counts[k]`
+    ordered vertices, and `planes` is (P, d + 1), keeping the points where
+    `planes[k, :d] . x + planes[k, d] >= 0`. Returns the clipped polygons as a
+    padded (P, M + 1, d) array along with their new vertex counts.
+    """
+    polygons = np.asarray(polygons, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.int64)
+    planes = np.asarray(planes, dtype=np.float64)
+    n, m, d = polygons.shape
+    rows = np.arange(n)
+    out = np.zeros((n, m + 1, d))
+    out_counts = np.zeros(n, dtype=np.int64)
+    dist = np.einsum("pmd,pd->pm", polygons, planes[:, :d]) + planes[:, d:]
+    for v in range(m):
+        active = v < counts
+        nxt = (v + 1) % np.maximum(counts, 1)
+        p, q = polygons[:, v], polygons[rows, nxt]
+        dp, dq = dist[:, v], dist[rows, nxt]
+        keep = active & (dp >= 0)
+        out[rows[keep], out_counts[keep]] = p[keep]
+        out_counts += keep
+        cross = active & (((dp > 0) & (dq < 0)) | ((dp < 0) & (dq > 0)))
+        t = dp[cross] / (dp[cross] - dq[cross])
+        out[rows[cross], out_counts[cross]] = p[cross] + t[:, None] * (
+            q[cross] - p[cross]
+        )
+        out_counts += cross
+    return out, out_counts
+
+
+def convex_order(points, rtol: float = 1e-6):
+    """
+    Order the vertices of a convex 2D point set counterclockwise, dropping
+    points closer than `rtol` times the size of the set to their neighbors.
+    Returns an (N, 2) array.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        return points
+    center = points.mean(axis=0)
+    angles = np.arctan2(points[:, 1] - center[1], points[:, 0] - center[0])
+    points = points[np.argsort(angles)]
+    tol = rtol * np.max(np.ptp(points, axis=0))
+    keep = [0]
+    for k in range(1, len(points)):
+        if np.linalg.norm(points[k] - points[keep[-1]]) > tol:
+            keep.append(k)
+    if len(keep) > 1 and np.linalg.norm(points[keep[-1]] - points[0]) <= tol:
+        keep.pop()
+    return points[keep]
+
+
+def polygon_area(points):
+    """Signed area of a 2D polygon, positive when counterclockwise."""
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+
+
+def intersect_convex(polygon_a, polygon_b, eps: float = 1e-12):
+    """
+    Intersect two convex 2D polygons, given as (N, 2) arrays of vertices in any
+    order. Returns the counterclockwise intersection polygon, which is empty
+    when the polygons are disjoint, only touch, or either one is degenerate.
+    """
+    a, b = convex_order(polygon_a), convex_order(polygon_b)
+    if len(a) < 3 or len(b) < 3:
+        return np.zeros((0, 2))
+    if abs(polygon_area(a)) <= eps or abs(polygon_area(b)) <= eps:
+        return np.zeros((0, 2))
+
+    result, count = a[None], np.array([len(a)])
+    for p, q in zip(b, np.roll(b, -1, axis=0)):
+        # Inward normal of the counterclockwise edge p -> q.
+        normal = np.array([p[1] - q[1], q[0] - p[0]])
+        plane = np.append(normal, -normal @ p)[None]
+        result, count = clip_polygons(result, count, plane)
+        if count[0] < 3:
+            return np.zeros((0, 2))
+
+    result = convex_order(result[0, : count[0]])
+    if len(result) < 3 or abs(polygon_area(result)) <= eps:
+        return np.zeros((0, 2))
+    return result
@@ -1,101 +1,279 @@
+import numpy as np
 import taichi as ti
-from taichi_glsl import length, sqrt
-
-ti.init(arch=ti.gpu)
-
-# 5x9 grid of springs
-n, m = 5, 9
-gravity = 9.8
-k_spring, k_spring_diag = 1e5, 2e4
-k_resistance = 0.5
-
-pos = ti.Vector.field(2, dtype=float, shape=(n, m))
-vel = ti.Vector.field(2, dtype=float, shape=(n, m))
-forces = ti.Vector.field(2, dtype=float, shape=(n, m))
-rest_lengths = ti.field(dtype=float, shape=(3,))
-
-
-@ti.kernel
-def initialize():
-    len1, len2 = 0.5 / (n - 1), 0.8 / (m - 1)
-    rest_lengths[0] = len1  # i -> i + 1
-    rest_lengths[1] = len2  # j -> j + 1
-    rest_lengths[2] = sqrt(len1 ** 2 + len2 ** 2)  # (i, j) -> (i + 1, j + 1)
-    for i, j in pos:
-        pos[i, j] = ti.Vector([0.1 + 0.8 * j / (m - 1), 0.9 - 0.5 * i / (n - 1)])
-        vel[i, j] = ti.Vector([0.0, 0.0])
-
-
-@ti.kernel
-def apply_spring_force():
-    """Fill in the `forces` field with spring forces between points."""
-    for i, j in pos:
-        forces[i, j] = ti.Vector([0.0, -gravity])
-        forces[i, j] -= k_resistance * vel[i, j]
-    for i, j in pos:
-        if i < n - 1:
-            d = pos[i, j] - pos[i + 1, j]
-            force = k_spring * (length(d) - rest_lengths[0])
-            forces[i, j] += -force * d
-            forces[i + 1, j] += force * d
-        if j < m - 1:
-            d = pos[i, j] - pos[i, j + 1]
-            force = k_spring * (length(d) - rest_lengths[1])
-            forces[i, j] += -force * d
-            forces[i, j + 1] += force * d
-        if i < n - 1 and j < m - 1:
-            d = pos[i, j] - pos[i + 1, j + 1]
-            force = k_spring_diag * (length(d) - rest_lengths[2])
-            forces[i, j] += -force * d
-            forces[i + 1, j + 1] += force * d
-
-            d = pos[i + 1, j] - pos[i, j + 1]
-            force = k_spring_diag * (length(d) - rest_lengths[2])
-            forces[i + 1, j] += -force * d
-            forces[i, j + 1] += force * d
-
-
-@ti.kernel
-def advance(t: float):
-    """Advance the simulation by `t` units of time."""
-    for i, j in pos:
-        if i != 0 or (j != 0 and j != m - 1):
-            # This is not a typo! Updating v first is more stable; it is the symplectic Euler method.
-            # https://en.wikipedia.org/wiki/Semi-implicit_Euler_method
-            dv = t * forces[i, j]
-            v = vel[i, j] + dv
-            vel[i, j] += dv
-            pos[i, j] += t * v
-
-
-def run():
+
+from .precision import get_precision
+from .recording import record
+from .runtime import init
+
+
+def grid_springs(n: int, m: int):
+    """
+    Springs of an n x m grid of points numbered row by row, as an (E, 2) array
+    of point indices with a (E,) mask of the diagonal springs.
+    """
+    idx = np.arange(n * m).reshape(n, m)
+    edges = [
+        (idx[:-1, :], idx[1:, :], False),  # (i, j) -> (i + 1, j)
+        (idx[:, :-1], idx[:, 1:], False),  # (i, j) -> (i, j + 1)
+        (idx[:-1, :-1], idx[1:, 1:], True),  # (i, j) -> (i + 1, j + 1)
+        (idx[1:, :-1], idx[:-1, 1:], True),  # (i + 1, j) -> (i, j + 1)
+    ]
+    springs = np.concatenate(
+        [np.stack([a.ravel(), b.ravel()], axis=1) for a, b, _ in edges]
+    )
+    diagonal = np.concatenate([np.full(a.size, diag) for a, _, diag in edges])
+    return springs.astype(np.int32), diagonal
+
+
+@ti.data_oriented
+class Cloth:
+    """
+    A cloth made of an n x m grid of unit masses linked by springs, with the top
+    two corners pinned in place.
+
+    Springs are stored as an edge list, and their forces are accumulated into
+    the points with atomic adds, so any grid size runs in parallel. `step` uses
+    either the symplectic Euler method, which needs small timesteps for stiff
+    springs, or backward Euler solved by conjugate gradient, which stays stable
+    at large timesteps.
+    """
+
+    def __init__(
+        self,
+        n: int = 5,
+        m: int = 9,
+        width: float = 0.8,
+        height: float = 0.5,
+        k_spring: float = 1e5,
+        k_spring_diag: float = 2e4,
+        k_resistance: float = 0.5,
+        gravity: float = 9.8,
+    ):
+        init()
+        self.n, self.m = n, m
+        self.dtype = get_precision().storage
+        self.k_resistance = k_resistance
+        self.gravity = gravity
+        springs, diagonal = grid_springs(n, m)
+        self.n_springs = len(springs)
+
+        j, i = np.meshgrid(np.arange(m), np.arange(n))
+        pos = np.stack(
+            [0.1 + width * j / max(m - 1, 1), 0.9 - height * i / max(n - 1, 1)], axis=2
+        ).reshape(-1, 2)
+        pos = pos.astype(get_precision().storage_np)
+        pinned = np.zeros((n, m), dtype=np.int32)
+        pinned[0, [0, m - 1]] = 1
+
+        shape = (n * m,)
+        self.pos = ti.Vector.field(2, dtype=self.dtype, shape=shape)
+        self.vel = ti.Vector.field(2, dtype=self.dtype, shape=shape)
+        self.forces = ti.Vector.field(2, dtype=self.dtype, shape=shape)
+        self.pinned = ti.field(dtype=ti.i32, shape=shape)
+        self.springs = ti.Vector.field(2, dtype=ti.i32, shape=(self.n_springs,))
+        self.rest_lengths = ti.field(dtype=self.dtype, shape=(self.n_springs,))
+        self.stiffness = ti.field(dtype=self.dtype, shape=(self.n_springs,))
+        # Derivative of each spring force with respect to its length vector.
+        self.jacobian = ti.Matrix.field(2, 2, dtype=self.dtype, shape=(self.n_springs,))
+        # Conjugate gradient vectors.
+        self.b = ti.Vector.field(2, dtype=self.dtype, shape=shape)
+        self.x = ti.Vector.field(2, dtype=self.dtype, shape=shape)
+        self.r = ti.Vector.field(2, dtype=self.dtype, shape=shape)
+        self.d = ti.Vector.field(2, dtype=self.dtype, shape=shape)
+        self.q = ti.Vector.field(2, dtype=self.dtype, shape=shape)
+
+        self.initial_pos = pos
+        self.pinned.from_numpy(pinned.ravel())
+        self.springs.from_numpy(springs)
+        self.rest_lengths.from_numpy(
+            np.linalg.norm(pos[springs[:, 0]] - pos[springs[:, 1]], axis=1)
+        )
+        stiffness = np.where(diagonal, k_spring_diag, k_spring)
+        self.stiffness.from_numpy(stiffness.astype(pos.dtype))
+        self.cg_iterations = 0
+        self.reset()
+
+    def reset(self):
+        self.pos.from_numpy(self.initial_pos)
+        self.vel.from_numpy(np.zeros_like(self.initial_pos))
+
+    def positions(self):
+        """Positions of the points as an (n, m, 2) array."""
+        return self.pos.to_numpy().reshape(self.n, self.m, 2)
+
+    @ti.kernel
+    def compute_forces(self):
+        """Fill in `forces` with gravity and spring forces, and `jacobian`."""
+        for i in self.pos:
+            self.forces[i] = ti.Vector([0.0, -self.gravity])
+        for e in self.springs:
+            i, j = self.springs[e][0], self.springs[e][1]
+            d = self.pos[i] - self.pos[j]
+            length = ti.max(d.norm(), 1e-12)
+            u = d / length
+            force = -self.stiffness[e] * (length - self.rest_lengths[e]) * u
+            ti.atomic_add(self.forces[i], force)
+            ti.atomic_add(self.forces[j], -force)
+            # Compressed springs drop their transverse term, which keeps the
+            # implicit system positive definite.
+            uu = u.outer_product(u)
+            transverse = ti.max(1 - self.rest_lengths[e] / length, 0.0)
+            eye = ti.Matrix([[1.0, 0.0], [0.0, 1.0]])
+            self.jacobian[e] = self.stiffness[e] * (uu + transverse * (eye - uu))
+
+    @ti.kernel
+    def advance(self, t: float):
+        """Advance the simulation by `t` units of time with symplectic Euler."""
+        for i in self.pos:
+            if self.pinned[i] == 0:
+                # This is not a typo! Updating v first is more stable; it is the symplectic Euler method.
+                # https://en.wikipedia.org/wiki/Semi-implicit_Euler_method
+                accel = self.forces[i] - self.k_resistance * self.vel[i]
+                self.vel[i] += t * accel
+                self.pos[i] += t * self.vel[i]
+
+    @ti.kernel
+    def implicit_rhs(self, t: float):
+        for i in self.pos:
+            self.b[i] = self.vel[i] + t * self.forces[i]
+            self.x[i] = self.vel[i]
+            if self.pinned[i] != 0:
+                self.b[i] = ti.Vector([0.0, 0.0])
+                self.x[i] = ti.Vector([0.0, 0.0])
+
+    @ti.kernel
+    def apply_system(self, p: ti.template(), q: ti.template(), t: float):
+        """q = (I + t c + t^2 K) p, with the rows of pinned points cleared."""
+        for i in p:
+            q[i] = (1 + t * self.k_resistance) * p[i]
+        for e in self.springs:
+            i, j = self.springs[e][0], self.springs[e][1]
+            dq = t * t * (self.jacobian[e] @ (p[i] - p[j]))
+            ti.atomic_add(q[i], dq)
+            ti.atomic_add(q[j], -dq)
+        for i in p:
+            if self.pinned[i] != 0:
+                q[i] = ti.Vector([0.0, 0.0])
+
+    @ti.kernel
+    def dot(self, a: ti.template(), b: ti.template()) -> float:
+        result = 0.0
+        for i in a:
+            result += a[i].dot(b[i])
+        return result
+
+    @ti.kernel
+    def residual(self):
+        for i in self.r:
+            self.r[i] = self.b[i] - self.q[i]
+            self.d[i] = self.r[i]
+
+    @ti.kernel
+    def update_solution(self, alpha: float):
+        for i in self.x:
+            self.x[i] += alpha * self.d[i]
+            self.r[i] -= alpha * self.q[i]
+
+    @ti.kernel
+    def update_direction(self, beta: float):
+        for i in self.d:
+            self.d[i] = self.r[i] + beta * self.d[i]
+
+    @ti.kernel
+    def finish_implicit(self, t: float):
+        for i in self.pos:
+            self.vel[i] = self.x[i]
+            self.pos[i] += t * self.vel[i]
+
+    def advance_implicit(self, t: float, tol: float = 1e-6, max_iters: int = 200):
+        """
+        Advance by `t` with backward Euler, linearizing the spring forces at the
+        current positions. The new velocities v' solve
+
+            (I + t c + t^2 K) v' = v + t f,
+
+        with damping c and stiffness matrix K, which is solved with conjugate
+        gradient to a relative residual of `tol`.
+        """
+        self.implicit_rhs(t)
+        self.apply_system(self.x, self.q, t)
+        self.residual()
+        rr = self.dot(self.r, self.r)
+        target = tol**2 * max(self.dot(self.b, self.b), 1e-30)
+        iters = 0
+        while rr > target and iters < max_iters:
+            self.apply_system(self.d, self.q, t)
+            alpha = rr / self.dot(self.d, self.q)
+            self.update_solution(alpha)
+            rr, rr_old = self.dot(self.r, self.r), rr
+            self.update_direction(rr / rr_old)
+            iters += 1
+        self.cg_iterations = iters
+        self.finish_implicit(t)
+
+    def step(self, t: float, implicit: bool = False):
+        self.compute_forces()
+        if implicit:
+            self.advance_implicit(t)
+        else:
+            self.advance(t)
+
+
+def draw(gui, cloth):
+    pos_np = cloth.positions()
+    gui.circles(pos_np.reshape((-1, 2)), radius=max(1, min(5, 300 / cloth.m)))
+    if cloth.n * cloth.m > 10000:
+        return  # too many springs to draw one by one
+    gui.lines(
+        pos_np[:-1, :].reshape((-1, 2)),
+        pos_np[1:, :].reshape((-1, 2)),
+        radius=1,
+    )
+    gui.lines(
+        pos_np[:, :-1].reshape((-1, 2)),
+        pos_np[:, 1:].reshape((-1, 2)),
+        radius=1,
+    )
+    gui.lines(
+        pos_np[:-1, :-1].reshape((-1, 2)),
+        pos_np[1:, 1:].reshape((-1, 2)),
+        radius=1,
+    )
+    gui.lines(
+        pos_np[1:, :-1].reshape((-1, 2)),
+        pos_np[:-1, 1:].reshape((-1, 2)),
+        radius=1,
+    )
+
+
+def run(n: int = 5, m: int = 9, implicit: bool = False, dt: float = 1e-3):
+    cloth = Cloth(n, m)
     gui = ti.GUI("Cloth Simulation", res=(600, 600))
-    initialize()
+    # Explicit steps take five substeps per frame for the stiff springs.
+    substeps = 1 if implicit else 5
     while gui.running:
-        pos_np = pos.to_numpy()
-        gui.circles(pos_np.reshape((-1, 2)), radius=5)
-        gui.lines(
-            pos_np[:-1, :].reshape((-1, 2)),
-            pos_np[1:, :].reshape((-1, 2)),
-            radius=1,
-        )
-        gui.lines(
-            pos_np[:, :-1].reshape((-1, 2)),
-            pos_np[:, 1:].reshape((-1, 2)),
-            radius=1,
-        )
-        gui.lines(
-            pos_np[:-1, :-1].reshape((-1, 2)),
-            pos_np[1:, 1:].reshape((-1, 2)),
-            radius=1,
-        )
-        gui.lines(
-            pos_np[1:, :-1].reshape((-1, 2)),
-            pos_np[:-1, 1:].reshape((-1, 2)),
-            radius=1,
-        )
+        draw(gui, cloth)
         gui.show()
 
-        for _ in range(5):
-            apply_spring_force()
-            advance(1e-3)
+        for _ in range(substeps):
+            cloth.step(dt, implicit=implicit)
+
+
+def simulate(
+    n: int = 5,
+    m: int = 9,
+    steps: int = 1000,
+    out=None,
+    every: int = 1,
+    implicit: bool = False,
+    dt: float = 1e-3,
+):
+    """Run without a GUI, saving (frames, n, m, 2) positions into `out`."""
+    cloth = Cloth(n, m)
+    return record(
+        lambda: cloth.step(dt, implicit=implicit),
+        cloth.positions,
+        steps,
+        out=out,
+        every=every,
+    )
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .bvh import candidate_pairs, overlapping_pairs
+
+
+class ContactCache:
+    """
+    Persistent contact candidates between pairs of objects across time steps.
+
+    On a miss, the cache searches both bounding volume hierarchies with the
+    boxes of B grown by `margin`, and keeps the resulting tet pairs along with
+    the pose of A relative to B. As long as no point of A has since moved by
+    more than `margin` relative to B, every pair of boxes that overlaps now was
+    among those pairs, so a hit only filters them by overlap again. Once the
+    bound on the motion exceeds `margin`, the pair is searched again, so no
+    contact is ever missed.
+
+    At most `capacity` object pairs are kept, evicting the least recently used.
+    `hits`, `misses` and `evictions` count object pair lookups.
+    """
+
+    def __init__(self, capacity: int = 1024, margin: float = 0.01):
+        self.capacity = capacity
+        self.margin = margin
+        self.entries = OrderedDict()  # key -> (tet pairs, relative pose)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def candidate_pairs(self, a, b, key=None):
+        """Return the (N, 2) candidate tet pairs of A and B for this step."""
+        if key is None:
+            key = (id(a), id(b))
+        relative = np.linalg.solve(b.pose_np, a.pose_np)
+        entry = self.entries.get(key)
+        if entry is not None and motion_bound(a, entry[1], relative) <= self.margin:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return overlapping_pairs(a, b, entry[0])
+
+        self.misses += 1
+        pairs = candidate_pairs(a, b, self.margin)
+        self.entries[key] = (pairs, relative)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return overlapping_pairs(a, b, pairs)
+
+    def discard(self, key):
+        """Forget an object pair, e.g. once its bounding boxes stop overlapping."""
+        self.entries.pop(key, None)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+def motion_bound(a, before, after):
+    """
+    Bound how far any point of A moves when its pose relative to B changes from
+    `before` to `after`, using the bounding box of A around its own origin.
+    """
+    lo, hi = a.bvh.lo[0], a.bvh.hi[0]
+    radius = np.linalg.norm(np.maximum(np.abs(lo), np.abs(hi)))
+    delta = after - before
+    return np.linalg.norm(delta[:3, :3]) * radius + np.linalg.norm(delta[:3, 3])
@@ -0,0 +1,27 @@
+"""
+Keep the test session out of the user's cache. Before any test module
+initializes the runtime, `HYDROELASTICS_CACHE` points generated meshes at a
+temporary directory and the on-disk kernel cache is turned off, since Taichi
+only writes it when the process exits. Both are restored when the session ends.
+"""
+
+import os
+import shutil
+import tempfile
+
+_previous = {
+    name: os.environ.get(name)
+    for name in ("HYDROELASTICS_CACHE", "HYDROELASTICS_OFFLINE_CACHE")
+}
+_cache = tempfile.mkdtemp(prefix="hydroelastics-")
+os.environ["HYDROELASTICS_CACHE"] = _cache
+os.environ["HYDROELASTICS_OFFLINE_CACHE"] = "0"
+
+
+def pytest_unconfigure(config):
+    for name, value in _previous.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    shutil.rmtree(_cache, ignore_errors=True)
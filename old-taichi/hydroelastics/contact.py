@@ -0,0 +1,289 @@
+import taichi as ti
+import numpy as np
+
+from .clip import clip_halfspace
+from . import profiling
+from .precision import wider
+from .runtime import current_program, init
+
+# A tet-plane cross-section has at most 4 vertices, and clipping it against each
+# of the 4 faces of another tet adds at most one vertex per face.
+MAX_POLYGON_VERTS = 8
+
+
+@ti.data_oriented
+class PairWorkspace:
+    """
+    Scratch fields for evaluating a batch of tet pairs in a single kernel launch.
+
+    Tet coordinates and potential equations are gathered on the host in body
+    coordinates, and moved to the world frame by the object poses inside the
+    kernel, so the kernels only ever see these fields and are compiled once per
+    workspace. All fields and arithmetic use the floating point type `dtype`.
+    """
+
+    def __init__(self, capacity: int, dtype=ti.f32):
+        self.capacity = capacity
+        self.dtype = dtype
+        self.dtype_np = np.float64 if dtype == ti.f64 else np.float32
+        self.coords_a = ti.Vector.field(3, dtype=dtype, shape=(capacity, 4))
+        self.coords_b = ti.Vector.field(3, dtype=dtype, shape=(capacity, 4))
+        # Linear potentials (gx, gy, gz, d) of each tet, from the mesh caches.
+        self.eq_a = ti.Vector.field(4, dtype=dtype, shape=(capacity,))
+        self.eq_b = ti.Vector.field(4, dtype=dtype, shape=(capacity,))
+        self.planes = ti.Vector.field(4, dtype=dtype, shape=(capacity,))
+        self.counts = ti.field(dtype=ti.i32, shape=(capacity,))
+        # Two ping-pong buffers per pair for Sutherland-Hodgman clipping.
+        self.polygons = ti.Vector.field(
+            3, dtype=dtype, shape=(capacity, 2, MAX_POLYGON_VERTS)
+        )
+        self.pair_forces = ti.Vector.field(3, dtype=dtype, shape=(capacity,))
+        self.pair_centers = ti.Vector.field(3, dtype=dtype, shape=(capacity,))
+        self.poses = ti.Matrix.field(4, 4, dtype=dtype, shape=(2,))
+        self.coms = ti.Vector.field(3, dtype=dtype, shape=(2,))
+        # Net force on A, torque on A and torque on B.
+        self.wrench = ti.Vector.field(3, dtype=dtype, shape=(3,))
+
+    def load(self, coords_a, eq_a, coords_b, eq_b):
+        self.coords_a.from_numpy(_pad(coords_a, self.capacity, self.dtype_np))
+        self.eq_a.from_numpy(_pad(eq_a, self.capacity, self.dtype_np))
+        self.coords_b.from_numpy(_pad(coords_b, self.capacity, self.dtype_np))
+        self.eq_b.from_numpy(_pad(eq_b, self.capacity, self.dtype_np))
+
+    @ti.func
+    def to_world(self, i, coords: ti.template(), eq: ti.template(), k: ti.template()):
+        """Move the body-frame coordinates and equation of pair i by pose k."""
+        pose = self.poses[k]
+        rot = ti.Matrix(
+            [
+                [pose[0, 0], pose[0, 1], pose[0, 2]],
+                [pose[1, 0], pose[1, 1], pose[1, 2]],
+                [pose[2, 0], pose[2, 1], pose[2, 2]],
+            ]
+        )
+        t = ti.Vector([pose[0, 3], pose[1, 3], pose[2, 3]])
+        for j in ti.static(range(4)):
+            coords[i, j] = rot @ coords[i, j] + t
+        e = eq[i]
+        g = rot @ ti.Vector([e[0], e[1], e[2]])
+        eq[i] = ti.Vector([g[0], g[1], g[2], e[3] - g.dot(t)])
+
+    @ti.func
+    def may_touch(self, i, plane):
+        """
+        Cheap early-outs before any clipping: the potential ranges of the two
+        tets must overlap, or else the two pressures are never equal inside both
+        of them, and tet B must have vertices on both sides of `plane`.
+        """
+        lo_a, hi_a = ti.cast(1e30, self.dtype), ti.cast(-1e30, self.dtype)
+        lo_b, hi_b = ti.cast(1e30, self.dtype), ti.cast(-1e30, self.dtype)
+        below, above = False, False
+        for j in ti.static(range(4)):
+            pa = _evaluate(self.eq_a[i], self.coords_a[i, j])
+            pb = _evaluate(self.eq_b[i], self.coords_b[i, j])
+            lo_a, hi_a = ti.min(lo_a, pa), ti.max(hi_a, pa)
+            lo_b, hi_b = ti.min(lo_b, pb), ti.max(hi_b, pb)
+            side = _evaluate(plane, self.coords_b[i, j])
+            below = below or side <= 0
+            above = above or side >= 0
+        # Potentials at the vertices are rebuilt from the equations, so allow
+        # for rounding when the two ranges just touch.
+        scale = ti.max(
+            ti.max(ti.abs(lo_a), ti.abs(hi_a)), ti.max(ti.abs(lo_b), ti.abs(hi_b))
+        )
+        slack = 1e-5 * scale
+        return lo_a <= hi_b + slack and lo_b <= hi_a + slack and below and above
+
+    @ti.func
+    def cross_section(self, i, plane):
+        """Write the ordered cross-section of tet A with `plane` into buffer 0."""
+        n = ti.Vector([plane[0], plane[1], plane[2]])
+        cnt = 0
+        for j in ti.static(range(4)):
+            for k in ti.static(range(j + 1, 4)):
+                pj, pk = self.coords_a[i, j], self.coords_a[i, k]
+                sj, sk = n.dot(pj) + plane[3], n.dot(pk) + plane[3]
+                if (sj > 0) != (sk > 0):
+                    self.polygons[i, 0, cnt] = pj + sj / (sj - sk) * (pk - pj)
+                    cnt += 1
+        if cnt == 4:
+            # Crossing edges come out in lexicographic order, which for a 2-2
+            # split of the vertices always has the last two corners swapped.
+            tmp = self.polygons[i, 0, 2]
+            self.polygons[i, 0, 2] = self.polygons[i, 0, 3]
+            self.polygons[i, 0, 3] = tmp
+        return cnt
+
+    @ti.func
+    def clip_face(
+        self, i, cnt, src: ti.template(), dst: ti.template(), k: ti.template()
+    ):
+        """Clip the polygon in buffer `src` by the inner side of face `k` of tet B."""
+        a = self.coords_b[i, (k + 1) % 4]
+        n = (self.coords_b[i, (k + 2) % 4] - a).cross(self.coords_b[i, (k + 3) % 4] - a)
+        if n.dot(self.coords_b[i, k] - a) < 0:
+            n = -n
+        return clip_halfspace(self.polygons, i, cnt, src, dst, n, a)
+
+    @ti.func
+    def dedup(self, i, cnt):
+        """Drop repeated consecutive vertices, which appear at degenerate corners."""
+        out = 0
+        for v in range(cnt):
+            p = self.polygons[i, 0, v]
+            keep = True
+            if out > 0 and (p - self.polygons[i, 0, out - 1]).norm_sqr() < 1e-12:
+                keep = False
+            if keep:
+                self.polygons[i, 0, out] = p
+                out += 1
+        if (
+            out > 1
+            and (self.polygons[i, 0, out - 1] - self.polygons[i, 0, 0]).norm_sqr()
+            < 1e-12
+        ):
+            out -= 1
+        if out < 3:
+            out = 0
+        return out
+
+    @ti.kernel
+    def run(self, n: ti.i32):
+        for i in range(n):
+            self.to_world(i, self.coords_a, self.eq_a, 0)
+            self.to_world(i, self.coords_b, self.eq_b, 1)
+            plane = self.eq_a[i] - self.eq_b[i]
+            self.planes[i] = plane
+            cnt = 0
+            degenerate = plane[0] ** 2 + plane[1] ** 2 + plane[2] ** 2 < 1e-6
+            if not degenerate and self.may_touch(i, plane):
+                cnt = self.cross_section(i, plane)
+                for k in ti.static(range(4)):
+                    cnt = self.clip_face(i, cnt, k % 2, 1 - k % 2, k)
+                cnt = self.dedup(i, cnt)
+            self.counts[i] = cnt
+
+    @ti.kernel
+    def integrate(self, n: ti.i32):
+        """
+        Integrate the pressure of A over each polygon found by `run()`, and sum
+        the resulting forces and torques into `wrench` with atomic adds.
+        """
+        for k in ti.static(range(3)):
+            self.wrench[k] = ti.Vector.zero(self.dtype, 3)
+        for i in range(n):
+            force = ti.Vector.zero(self.dtype, 3)
+            center = ti.Vector.zero(self.dtype, 3)
+            eq = self.eq_a[i]
+            grad = ti.Vector([eq[0], eq[1], eq[2]])
+            p0 = self.polygons[i, 0, 0]
+            total, area = ti.cast(0.0, self.dtype), ti.cast(0.0, self.dtype)
+            moment = ti.Vector.zero(self.dtype, 3)
+            for v in range(2, self.counts[i]):
+                p1, p2 = self.polygons[i, 0, v - 1], self.polygons[i, 0, v]
+                tri_area = 0.5 * (p1 - p0).cross(p2 - p0).norm()
+                tri_center = (p0 + p1 + p2) / 3
+                total += (grad.dot(tri_center) + eq[3]) * tri_area
+                area += tri_area
+                moment += tri_area * tri_center
+            if area >= 1e-9:
+                plane = self.planes[i]
+                normal = ti.Vector([plane[0], plane[1], plane[2]]).normalized()
+                if normal.dot(self.coms[0] - self.coms[1]) < 0:
+                    normal = -normal
+                force = total * normal
+                center = moment / area
+            self.pair_forces[i] = force
+            self.pair_centers[i] = center
+            self.wrench[0] += force
+            self.wrench[1] += (center - self.coms[0]).cross(force)
+            self.wrench[2] += (center - self.coms[1]).cross(-force)
+
+
+@ti.func
+def _evaluate(eq, x):
+    return eq[0] * x[0] + eq[1] * x[1] + eq[2] * x[2] + eq[3]
+
+
+def _pad(arr, capacity: int, dtype):
+    out = np.zeros((capacity,) + arr.shape[1:], dtype=dtype)
+    out[: len(arr)] = arr
+    return out
+
+
+_workspaces = {}
+_workspace_prog = None
+
+
+def get_workspace(n: int, dtype=ti.f32) -> PairWorkspace:
+    """Return a shared workspace of type `dtype` with room for at least `n` pairs."""
+    global _workspace_prog
+    init()
+    # Fields do not survive `ti.init()`, so start over if the runtime changed.
+    prog = current_program()
+    if _workspace_prog is not prog:
+        _workspaces.clear()
+        _workspace_prog = prog
+    workspace = _workspaces.get(dtype)
+    if workspace is None or workspace.capacity < n:
+        capacity = 64
+        while capacity < n:
+            capacity *= 2
+        workspace = _workspaces[dtype] = PairWorkspace(capacity, dtype)
+    return workspace
+
+
+def run_pairs(a, b, pairs) -> PairWorkspace:
+    """
+    Gather tet pairs of objects A, B into the workspace and intersect them, in
+    the compute type of the wider precision policy of A and B.
+    """
+    n = len(pairs)
+    ma, mb = a.mesh, b.mesh
+    ia, ib = pairs[:, 0], pairs[:, 1]
+
+    ws = get_workspace(n, wider(a.precision, b.precision).compute)
+    with profiling.stage("gather"):
+        ws.load(
+            ma.vertices_np[ma.tets_np[ia]],
+            ma.equations_np[ia],
+            mb.vertices_np[mb.tets_np[ib]],
+            mb.equations_np[ib],
+        )
+        ws.poses.from_numpy(np.array([a.pose_np, b.pose_np], dtype=ws.dtype_np))
+    with profiling.stage("clip"):
+        ws.run(n)
+    if profiling.enabled():
+        # Reading the counts back costs a sync, so only do it when profiling.
+        counts = ws.counts.to_numpy()[:n]
+        normals = ws.planes.to_numpy()[:n, :3]
+        profiling.count("pairs", n)
+        profiling.count("planes", np.count_nonzero(np.sum(normals**2, 1) >= 1e-6))
+        profiling.count("polygons", np.count_nonzero(counts >= 3))
+        profiling.count("empty_pairs", np.count_nonzero(counts < 3))
+    return ws
+
+
+def intersect_batch(a, b, pairs):
+    """
+    Batched version of `intersect()` over many tet pairs at once.
+
+    `pairs` is an (N, 2) array of (tet index in A, tet index in B). Returns a
+    tuple `(planes, offsets, points)` where `planes` is (N, 4) with the
+    equipressure plane of each pair, and polygon `k` is stored, in order and
+    without a repeated closing vertex, as `points[offsets[k]:offsets[k + 1]]`.
+    Pairs that do not intersect have empty polygons.
+    """
+    pairs = np.asarray(pairs, dtype=np.int32).reshape(-1, 2)
+    n = len(pairs)
+    if n == 0:
+        return np.zeros((0, 4)), np.zeros(1, dtype=np.int32), np.zeros((0, 3))
+
+    ws = run_pairs(a, b, pairs)
+    planes = ws.planes.to_numpy()[:n]
+    counts = ws.counts.to_numpy()[:n]
+    polygons = ws.polygons.to_numpy()[:n, 0]
+    offsets = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    mask = np.arange(MAX_POLYGON_VERTS)[None, :] < counts[:, None]
+    return planes, offsets, polygons[mask]
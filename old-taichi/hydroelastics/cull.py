@@ -0,0 +1,61 @@
+import numpy as np
+
+from . import profiling
+from .object import transform_equations
+
+
+def cull_pairs(a, b, pairs):
+    """
+    Drop candidate tet pairs of objects A, B that cannot have a contact polygon,
+    with a cascade of cheap tests run before any polygon is built:
+
+    1. the potential ranges of the two tets must overlap, or else the two
+       pressures are never equal inside both of them;
+    2. the equipressure plane must be well defined and have vertices of each
+       tet on both of its sides.
+
+    The pairs are expected to come from `candidate_pairs`, so their bounding
+    boxes are not tested again. `PairWorkspace.run` makes the same tests as
+    early-outs, so this is only worth it ahead of the NumPy contact path of
+    `ShardedContact`. Returns the surviving (N, 2) pairs. The pairs dropped by
+    each stage are counted as `culled_potential` and `culled_plane`.
+    """
+    pairs = np.asarray(pairs, dtype=np.int32).reshape(-1, 2)
+    profiling.count("candidates", len(pairs))
+
+    n = len(pairs)
+    ma, mb = a.mesh, b.mesh
+    pots_a = ma.potentials_np[ma.tets_np[pairs[:, 0]]]
+    pots_b = mb.potentials_np[mb.tets_np[pairs[:, 1]]]
+    keep = (pots_a.min(axis=1) <= pots_b.max(axis=1)) & (
+        pots_b.min(axis=1) <= pots_a.max(axis=1)
+    )
+    pairs = pairs[keep]
+    profiling.count("culled_potential", n - len(pairs))
+
+    # Signed distances to the plane eq_a(x) - eq_b(x) = 0 are evaluated in the
+    # frame of each tet, moving only the other tet's equation across.
+    n = len(pairs)
+    ia, ib = pairs[:, 0], pairs[:, 1]
+    relative = np.linalg.solve(b.pose_np, a.pose_np)  # frame of A, seen from B
+    eq_a, eq_b = ma.equations_np[ia], mb.equations_np[ib]
+    plane = eq_a - transform_equations(np.linalg.inv(relative), eq_b)
+    coords_a = ma.vertices_np[ma.tets_np[ia]].astype(np.float64)
+    coords_b = mb.vertices_np[mb.tets_np[ib]].astype(np.float64)
+    side_a = _evaluate(plane, coords_a)
+    side_b = _evaluate(transform_equations(relative, eq_a) - eq_b, coords_b)
+    keep = (
+        (np.sum(plane[:, :3] ** 2, axis=1) >= 1e-6)
+        & np.any(side_a > 0, axis=1)
+        & np.any(side_a <= 0, axis=1)
+        & np.any(side_b >= 0, axis=1)
+        & np.any(side_b <= 0, axis=1)
+    )
+    pairs = pairs[keep]
+    profiling.count("culled_plane", n - len(pairs))
+    return pairs
+
+
+def _evaluate(equations, coords):
+    """Values of (N, 4) equations at the (N, 4, 3) coordinates of each tet."""
+    return np.einsum("nvi,ni->nv", coords, equations[:, :3]) + equations[:, 3:]
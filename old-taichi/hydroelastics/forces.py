@@ -0,0 +1,43 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .bvh import candidate_pairs
+from .contact import run_pairs
+from . import profiling
+
+
+class ForceResult(NamedTuple):
+    """Result of a force calculation, expressed as vectors in the world frame."""
+
+    F_AB: np.ndarray  # The force applied to object A from B.
+    F_BA: np.ndarray  # The force applied to object B from A.
+    tau_AB: np.ndarray  # The torque applied to object A from B.
+    tau_BA: np.ndarray  # The torque applied to object B from A.
+
+
+def compute_force(A, B, pairs=None) -> ForceResult:
+    """
+    Computes force on object A due to contact with object B, along with the net
+    torques on both objects.
+
+    Pressure x area x normal is integrated over every intersecting tet pair in
+    one kernel launch and reduced in parallel. By default the tet pairs come
+    from the bounding volume hierarchies of A and B; pass `pairs` to evaluate a
+    given (N, 2) array of (tet index in A, tet index in B) instead. Pairs that
+    cannot be in contact are skipped inside the kernel before any clipping.
+    """
+    if pairs is None:
+        with profiling.stage("candidate_pairs"):
+            pairs = candidate_pairs(A, B)
+    if len(pairs) == 0:
+        zero = np.zeros(3)
+        return ForceResult(zero, zero.copy(), zero.copy(), zero.copy())
+
+    ws = run_pairs(A, B, pairs)
+    with profiling.stage("integrate"):
+        coms = np.array([A.world_com(), B.world_com()], dtype=ws.dtype_np)
+        ws.coms.from_numpy(coms)
+        ws.integrate(len(pairs))
+        force, tau_AB, tau_BA = ws.wrench.to_numpy().astype(np.float64)
+    return ForceResult(force, -force, tau_AB, tau_BA)
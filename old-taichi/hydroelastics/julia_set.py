@@ -1,6 +1,9 @@
 import taichi as ti
 
-ti.init(arch=ti.gpu)
+from .recording import record
+from .runtime import init
+
+init()
 
 n = 320
 pixels = ti.field(dtype=float, shape=(n * 2, n))
@@ -31,3 +34,16 @@ def run():
         t += 1
         gui.set_image(pixels)
         gui.show()
+
+
+def simulate(steps: int = 1000, out=None, every: int = 1):
+    """Render without a GUI, saving (frames, 2n, n) images into `out`."""
+    t = 0
+
+    def step():
+        nonlocal t
+        t += 1
+        paint(t * 0.03)
+
+    paint(0.0)
+    return record(step, pixels.to_numpy, steps, out=out, every=every)
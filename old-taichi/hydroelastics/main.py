@@ -1,32 +1,114 @@
 """Hydroelastic contact force simulations in Taichi."""
 
+from pathlib import Path
+from typing import List
+
 import typer
 
 app = typer.Typer(add_completion=False, help=__doc__)
 
 
+@app.callback()
+def main(
+    arch: str = typer.Option(
+        None, help="Taichi arch, such as cpu or gpu. [env: HYDROELASTICS_ARCH]"
+    ),
+    threads: int = typer.Option(
+        None, help="Maximum CPU threads. [env: HYDROELASTICS_THREADS]"
+    ),
+    precision: str = typer.Option(
+        None, help="Precision policy: f32, f64 or mixed. [env: HYDROELASTICS_PRECISION]"
+    ),
+    offline_cache: bool = typer.Option(
+        None,
+        "--offline-cache/--no-offline-cache",
+        help="Cache compiled kernels on disk. [env: HYDROELASTICS_OFFLINE_CACHE]",
+    ),
+):
+    """Settings for the Taichi runtime, which starts when a command needs it."""
+    from .runtime import configure
+
+    configure(arch, threads, precision, offline_cache)
+
+
 @app.command()
-def julia_set():
+def julia_set(
+    headless: bool = typer.Option(False, help="Run without a GUI window."),
+    steps: int = typer.Option(1000, help="Number of steps of a headless run."),
+    out: Path = typer.Option(
+        None, help="Where a headless run streams its snapshots, as a .npy file."
+    ),
+    every: int = typer.Option(1, help="Steps between saved snapshots."),
+):
     """Runs the official demo animated render of a Julia Set."""
-    from .julia_set import run
+    from .julia_set import run, simulate
 
-    run()
+    if headless:
+        simulate(steps, out=out, every=every)
+    else:
+        run()
 
 
 @app.command()
-def cloth():
+def cloth(
+    rows: int = typer.Option(5, help="Points along the height of the cloth."),
+    cols: int = typer.Option(9, help="Points along the width of the cloth."),
+    implicit: bool = typer.Option(
+        False, help="Take backward Euler steps, which allow a larger --dt."
+    ),
+    dt: float = typer.Option(1e-3, help="Timestep of the simulation."),
+    headless: bool = typer.Option(False, help="Run without a GUI window."),
+    steps: int = typer.Option(1000, help="Number of steps of a headless run."),
+    out: Path = typer.Option(
+        None, help="Where a headless run streams its snapshots, as a .npy file."
+    ),
+    every: int = typer.Option(1, help="Steps between saved snapshots."),
+):
     """Runs a simple cloth simulation based on linked springs."""
-    from .cloth import run
+    from .cloth import run, simulate
 
-    run()
+    if headless:
+        simulate(rows, cols, steps, out=out, every=every, implicit=implicit, dt=dt)
+    else:
+        run(rows, cols, implicit=implicit, dt=dt)
 
 
 @app.command()
-def spring_pendulum():
+def spring_pendulum(
+    headless: bool = typer.Option(False, help="Run without a GUI window."),
+    steps: int = typer.Option(1000, help="Number of steps of a headless run."),
+    out: Path = typer.Option(
+        None, help="Where a headless run streams its snapshots, as a .npy file."
+    ),
+    every: int = typer.Option(1, help="Steps between saved snapshots."),
+):
     """Runs a simple spring-pendulum physics simulation."""
-    from .spring_pendulum import run
+    from .spring_pendulum import run, simulate
+
+    if headless:
+        simulate(steps, out=out, every=every)
+    else:
+        run()
+
+
+@app.command()
+def bench(
+    out: Path = typer.Option(
+        Path("bench.json"), help="Where to write the JSON results."
+    ),
+    repeat: int = typer.Option(5, help="Number of timed repetitions per case."),
+    max_order: int = typer.Option(2, help="Largest icosphere subdivision order."),
+    trace: Path = typer.Option(None, help="Also write a profiled Chrome trace."),
+    precision: List[str] = typer.Option(
+        None,
+        help="Precision policy to run with: f32, f64 or mixed. Repeat to compare "
+        "several. Defaults to the global --precision.",
+    ),
+):
+    """Runs benchmarks of the contact pipeline and records them as JSON."""
+    from .bench import run
 
-    run()
+    run(out, repeat=repeat, max_order=max_order, trace=trace, precisions=precision)
 
 
 if __name__ == "__main__":
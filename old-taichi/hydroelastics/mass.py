@@ -0,0 +1,47 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class MassProperties(NamedTuple):
+    """Mass properties of a tet mesh with uniform density."""
+
+    volumes: np.ndarray  # shape: (n_tets,)
+    centroids: np.ndarray  # shape: (n_tets, 3)
+    volume: float
+    com: np.ndarray  # center of mass, shape: (3,)
+    inertia: np.ndarray  # inertia tensor about the center of mass, shape: (3, 3)
+
+
+def tet_coords(verts, tets):
+    """Gather the vertex coordinates of every tet into an (n_tets, 4, 3) array."""
+    verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+    tets = np.asarray(tets, dtype=np.int64).reshape(-1, 4)
+    return verts[tets]
+
+
+def tet_volumes(coords):
+    """Unsigned volumes of tets given as an (n_tets, 4, 3) coordinate array."""
+    edges = coords[:, 1:] - coords[:, :1]
+    return np.abs(np.linalg.det(edges)) / 6
+
+
+def mass_properties(verts, tets, mass: float = 1.0) -> MassProperties:
+    """
+    compute per-tet volumes and centroids, the center of mass, and the inertia
+    tensor of a mesh, all in batched numpy operations
+    """
+    coords = tet_coords(verts, tets)
+    volumes = tet_volumes(coords)
+    centroids = coords.mean(axis=1)
+    volume = volumes.sum()
+    com = volumes @ centroids / volume
+
+    # Second moment of each tet about the center of mass, using the closed form
+    # V / 20 * (sum_i v_i v_i^T + s s^T) with s = sum_i v_i.
+    rel = coords - com
+    s = rel.sum(axis=1)
+    second = np.einsum("nij,nik->njk", rel, rel) + np.einsum("ni,nj->nij", s, s)
+    covariance = np.einsum("n,nij->ij", volumes / 20, second) * (mass / volume)
+    inertia = np.trace(covariance) * np.eye(3) - covariance
+    return MassProperties(volumes, centroids, volume, com, inertia)
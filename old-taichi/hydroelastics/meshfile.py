@@ -0,0 +1,176 @@
+"""
+Compact binary container for tet meshes with potentials.
+
+A file starts with a 64-byte little-endian header:
+
+    magic      8 bytes   b"HYDRMESH"
+    version    uint32    currently 2
+    float_size uint32    4 for float32 or 8 for float64 vertices and potentials
+    n_vert     uint64
+    n_tets     uint64
+    n_nodes    uint64    number of nodes of the stored bounding volume tree
+    n_blocks   uint64
+    (padding)  16 bytes
+
+followed by a table of `n_blocks` uint64 byte offsets, one per block of
+`BLOCKS`, and the contiguous, 64-byte aligned blocks themselves. The first
+three are the mesh: verts (n_vert x 3 floats), potentials (n_vert floats) and
+tets (n_tets x 4 int32). The others hold data derived from it in float64 or
+int64, namely the pressure equations, the unit-mass properties and the arrays
+of the `TetBVH`, so loading an object does not recompute them. Loading maps the
+blocks into memory instead of reading them, so processes opening the same file
+share its pages.
+"""
+
+import struct
+
+import numpy as np
+
+from .bvh import LEAF_SIZE, TetBVH
+from .mass import MassProperties, mass_properties
+from .object import Mesh, Object, pressure_equations
+
+MAGIC = b"HYDRMESH"
+VERSION = 2
+HEADER = struct.Struct("<8sII4Q16x")
+ALIGN = 64
+
+# Block names, in file order. "mass" packs the volume, center of mass and
+# inertia tensor of the unit-mass properties into 13 floats.
+BLOCKS = (
+    "verts",
+    "potentials",
+    "tets",
+    "equations",
+    "volumes",
+    "centroids",
+    "mass",
+) + TetBVH.ARRAYS
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _specs(float_size, n_vert, n_tets, n_nodes):
+    """(dtype, shape) of every block, in file order."""
+    float_type = np.dtype(f"<f{float_size}")
+    f8, i8 = np.dtype("<f8"), np.dtype("<i8")
+    return [
+        (float_type, (n_vert, 3)),
+        (float_type, (n_vert,)),
+        (np.dtype("<i4"), (n_tets, 4)),
+        (f8, (n_tets, 4)),
+        (f8, (n_tets,)),
+        (f8, (n_tets, 3)),
+        (f8, (13,)),
+        (i8, (n_nodes, 2)),
+        (i8, (n_nodes, LEAF_SIZE)),
+        (i8, (n_nodes,)),
+        (f8, (n_nodes, 3)),
+        (f8, (n_nodes, 3)),
+        (f8, (n_tets, 3)),
+        (f8, (n_tets, 3)),
+    ]
+
+
+def save_mesh(path, verts, potentials, tets, dtype=np.float32):
+    """Write a mesh to `path`, storing coordinates and potentials as `dtype`."""
+    dtype = np.dtype(dtype).newbyteorder("<")
+    props = mass_properties(verts, tets)
+    equations = pressure_equations(verts, potentials, tets)
+    bvh = TetBVH(verts, tets)
+    verts = np.ascontiguousarray(verts, dtype=dtype).reshape(-1, 3)
+    potentials = np.ascontiguousarray(potentials, dtype=dtype).reshape(-1)
+    tets = np.ascontiguousarray(tets, dtype="<i4").reshape(-1, 4)
+    assert len(verts) == len(potentials)
+
+    mass = np.concatenate(([props.volume], props.com, props.inertia.ravel()))
+    arrays = [verts, potentials, tets, equations, props.volumes, props.centroids]
+    arrays += [mass] + [getattr(bvh, name) for name in TetBVH.ARRAYS]
+    specs = _specs(dtype.itemsize, len(verts), len(tets), len(bvh.children))
+    blocks = [np.ascontiguousarray(x, dtype=t) for x, (t, _) in zip(arrays, specs)]
+
+    offsets, offset = [], _align(HEADER.size + 8 * len(blocks))
+    for block in blocks:
+        offsets.append(offset)
+        offset = _align(offset + block.nbytes)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        dtype.itemsize,
+        len(verts),
+        len(tets),
+        len(bvh.children),
+        len(blocks),
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(np.array(offsets, dtype="<u8").tobytes())
+        for block, start in zip(blocks, offsets):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(block.tobytes())
+
+
+def _read_blocks(path, mmap: bool):
+    """Read every block of a mesh file into a dict keyed by block name."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not a mesh file")
+        magic, version, float_size, n_vert, n_tets, n_nodes, n_blocks = HEADER.unpack(
+            header
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a mesh file")
+        if version != VERSION or n_blocks != len(BLOCKS):
+            raise ValueError(f"unsupported mesh file version {version}")
+        offsets = np.frombuffer(f.read(8 * n_blocks), dtype="<u8")
+
+    blocks = {}
+    specs = _specs(float_size, n_vert, n_tets, n_nodes)
+    for name, (dtype, shape), offset in zip(BLOCKS, specs, offsets.tolist()):
+        if np.prod(shape) == 0:
+            blocks[name] = np.zeros(shape, dtype=dtype)
+        elif mmap:
+            blocks[name] = np.memmap(path, dtype, "r", offset=offset, shape=shape)
+        else:
+            count = int(np.prod(shape))
+            data = np.fromfile(path, dtype, count=count, offset=offset)
+            blocks[name] = data.reshape(shape)
+    return blocks
+
+
+def load_mesh(path, mmap: bool = True):
+    """
+    Read the (verts, potentials, tets) arrays of a mesh file. With `mmap`, they
+    are read-only memory maps of the file rather than copies.
+    """
+    blocks = _read_blocks(path, mmap)
+    return blocks["verts"], blocks["potentials"], blocks["tets"]
+
+
+def load_object(path, mass: float = 1.0, mmap: bool = True, precision=None) -> Object:
+    """
+    Create an object from a mesh file. The derived data stored in the file is
+    used as is, so with `mmap` it is shared between processes too.
+    """
+    blocks = _read_blocks(path, mmap)
+    props = MassProperties(
+        volumes=blocks["volumes"],
+        centroids=blocks["centroids"],
+        volume=float(blocks["mass"][0]),
+        com=np.array(blocks["mass"][1:4]),
+        inertia=np.array(blocks["mass"][4:]).reshape(3, 3),
+    )
+    bvh = TetBVH.from_arrays(*(blocks[name] for name in TetBVH.ARRAYS))
+    mesh = Mesh(
+        blocks["verts"],
+        blocks["potentials"],
+        blocks["tets"],
+        precision=precision,
+        equations=blocks["equations"],
+        mass_properties=props,
+        bvh=bvh,
+    )
+    return Object(mass=mass, mesh=mesh)
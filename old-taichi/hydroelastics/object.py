@@ -3,34 +3,132 @@ import numpy as np
 from typing import List, Tuple
 import math
 
-from shapely.geometry import Polygon
+from .bvh import TetBVH, transform_boxes
+from .clip import intersect_convex
+from .mass import mass_properties as compute_mass_properties
+from .mass import tet_coords, tet_volumes
+from . import profiling
+from .precision import get_precision, wider
+
+
+class Mesh:
+    """
+    Geometry of a tet mesh with potentials, kept as NumPy arrays on the host.
+
+    Inputs may be lists, NumPy arrays or any buffer-protocol object, and are
+    stored in `vertices_np`, `potentials_np` and `tets_np`. Floating point data
+    is stored in the type of the `precision` policy, by default the global one.
+    The contact kernels gather the tets they need from these arrays into their
+    own batched workspace, so a mesh allocates no Taichi fields at all.
+
+    The linear potential of every tet is solved for once and kept on the host,
+    in float64, in `equations_np`. The contact kernels gather the rows they need
+    from it along with the tet coordinates, so there is no device copy. The
+    equations are in the body frame of the mesh, so they stay valid however the
+    mesh is posed.
+
+    The equations, the unit-mass `mass_properties` and the `bvh` are derived
+    from the geometry unless they are passed in, e.g. read from a mesh file.
+    """
+
+    def __init__(
+        self,
+        verts,
+        potentials,
+        tets,
+        precision=None,
+        equations=None,
+        mass_properties=None,
+        bvh=None,
+    ):
+        self.precision = get_precision(precision)
+        dtype = self.precision.storage_np
+        # Host copies are only made when the input is not already contiguous
+        # with the storage types, so memory-mapped inputs keep sharing pages.
+        self.vertices_np = np.ascontiguousarray(verts, dtype=dtype).reshape(-1, 3)
+        self.potentials_np = np.ascontiguousarray(potentials, dtype=dtype)
+        self.potentials_np = self.potentials_np.reshape(-1)
+        self.tets_np = np.ascontiguousarray(tets, dtype=np.int32).reshape(-1, 4)
+        tets = self.tets_np
+        assert len(self.vertices_np) == len(self.potentials_np)
+        self.n_vert = len(self.vertices_np)
+        self.n_tets = len(tets)
+
+        # The derived data is computed from the inputs rather than the host
+        # copies, so it keeps full precision whatever the storage type.
+        if mass_properties is None:
+            mass_properties = compute_mass_properties(verts, tets)
+        if equations is None:
+            equations = pressure_equations(verts, potentials, tets)
+        if bvh is None:
+            bvh = TetBVH(verts, tets)
+        self.mass_properties = mass_properties  # for unit mass
+        self.equations_np = equations
+        self.bvh = bvh
 
 
 @ti.data_oriented
 class Object:
-    def __init__(self, verts, potentials, tets, mass: float):
-        assert len(verts) == len(potentials)
-        self.n_vert = len(verts)
-        self.n_tets = len(tets)
+    """
+    A rigid body made of a tet mesh.
+
+    Either pass `verts`, `potentials` and `tets` to build a new mesh, or pass an
+    existing `mesh` to share its geometry with other objects, so that every
+    instance only stores its own mass and pose. The object follows the
+    precision policy of its mesh.
+    """
+
+    def __init__(
+        self,
+        verts=None,
+        potentials=None,
+        tets=None,
+        mass: float = 1.0,
+        mesh=None,
+        precision=None,
+    ):
+        if mesh is None:
+            mesh = Mesh(verts, potentials, tets, precision=precision)
+        self.mesh = mesh
+        self.precision = mesh.precision
+        self.n_vert = mesh.n_vert
+        self.n_tets = mesh.n_tets
         self.mass = mass
-        self.vertices = ti.Vector.field(3, dtype=ti.f32, shape=(self.n_vert,))
-        self.potentials = ti.field(dtype=ti.f32, shape=(self.n_vert,))
-        self.tets = ti.Vector.field(4, dtype=ti.i32, shape=(self.n_tets,))
-        self.pose = ti.Matrix.field(4, 4, dtype=ti.f32, shape=())
-        self.com = center_of_mass(verts, tets)
-        for i in range(self.n_vert):
-            self.vertices[i] = verts[i]
+        props = mesh.mass_properties
+        self.mass_properties = props._replace(inertia=mass * props.inertia)
+        self.com = self.mass_properties.com
+        self.inertia = self.mass_properties.inertia
+        self.bvh = mesh.bvh
+
+        # Rigid transform from body to world coordinates. Moving an object only
+        # changes its pose; the mesh data is never rewritten. The pose stays on
+        # the host, and the contact kernels load it with the tet pairs.
+        self.set_pose(np.eye(4))
+
+    def set_pose(self, pose):
+        """Set the 4x4 pose matrix of this object."""
+        self.pose_np = np.array(pose, dtype=np.float64).reshape(4, 4)
+
+    def transform(self, matrix):
+        """Apply a 4x4 transform on top of the current pose."""
+        self.set_pose(np.asarray(matrix) @ self.pose_np)
 
-        for i in range(self.n_tets):
-            self.tets[i] = tets[i]
+    def translate(self, disp):
+        matrix = np.eye(4)
+        matrix[:3, 3] = disp
+        self.transform(matrix)
 
-        for i in range(self.n_vert):
-            self.potentials[i] = potentials[i]
+    def world_com(self):
+        return transform_points(self.pose_np, self.com)
 
-        # TODO: Make pose not none
-        self.pose = None
+    def world_bounds(self):
+        """World-space bounding box (lo, hi), derived from the body-space one."""
+        lo, hi = transform_boxes(self.bvh.lo[:1], self.bvh.hi[:1], self.pose_np)
+        return lo[0], hi[0]
 
-        # TODO: Initialize the fields with parameters
+    def instance(self, mass: float = None):
+        """Create another object that shares this object's mesh."""
+        return Object(mass=self.mass if mass is None else mass, mesh=self.mesh)
 
     # @ti.kernel
     def draw(self):
@@ -38,18 +136,31 @@ class Object:
         raise NotImplementedError()
 
 
+def transform_points(pose, points):
+    """
+    Applies a 4x4 transform to a point or an (N, 3) array of points.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    return points @ pose[:3, :3].T + pose[:3, 3]
+
+
+def transform_equations(pose, equations):
+    """
+    Expresses linear potentials (gx, gy, gz, d), given in body coordinates, in the
+    world frame of a rigid 4x4 pose. Works on one equation or an (N, 4) array.
+    """
+    equations = np.asarray(equations, dtype=np.float64)
+    grad = equations[..., :3] @ pose[:3, :3].T
+    offset = equations[..., 3] - grad @ pose[:3, 3]
+    return np.concatenate((grad, offset[..., None]), axis=-1)
+
+
 def center_of_mass(verts, tets):
     """
     compute center of mass of an object given vertex positions and tet shape
     """
-    tet_centers = []
-    vols = []
-    for tet in tets:
-        tet_vtxs = np.array([verts[i] for i in tet])
-        tet_centers.append(np.mean(tet_vtxs, axis=0))
-        tet_vtxs = np.hstack((tet_vtxs, np.ones((4, 1))))
-        vols.append(np.abs(np.linalg.det(tet_vtxs) / 6))
-    return np.average(np.array(tet_centers), weights=np.array(vols), axis=0)
+    coords = tet_coords(verts, tets)
+    return np.average(coords.mean(axis=1), weights=tet_volumes(coords), axis=0)
 
 
 def intersect(
@@ -57,163 +168,68 @@ def intersect(
 ) -> List[Tuple[float, float, float]]:
     """
     returns the 3-D polygon intersection between A, B, and the equipressure surfaces.
+
+    Everything is computed on the host copies of the meshes, in the compute type
+    of the wider of the two precision policies; use `contact.intersect_batch`
+    for many pairs at once.
     """
-    self_coords = ti.Vector.field(3, dtype=ti.f32, shape=(4,))
-    for i in range(4):
-        self_coords[i] = a.vertices[a.tets[a_face_idx][i]]
-    print("self_coords", self_coords)
-
-    def get_equations(vertices, tets, potentials, pose, face_idx):
-        self_coords = ti.Vector.field(3, dtype=ti.f32, shape=(4,))
-        for i in range(4):
-            self_coords[i] = vertices[tets[face_idx][i]]
-        print("self_coords", self_coords)
-        coord_matrix = ti.Matrix.field(4, 4, dtype=ti.f32, shape=())
-        for i in range(4):
-            for j in range(3):
-                coord_matrix[None][i, j] = self_coords[i][j]
-            coord_matrix[None][i, 3] = 1
-        print("coord_matrix", coord_matrix)
-        coords = coord_matrix[None].to_numpy()
-        # print("coords", x[None].inverse())
-        potential_vector = ti.Vector.field(4, dtype=ti.f32, shape=())
-        for i in range(4):
-            potential_vector[None][i] = potentials[tets[face_idx][i]]
-        # equation = coord_matrix[None].inverse() @ potential_vector[None]
-        equation = np.linalg.solve(coords, potential_vector.to_numpy())
-        print("equation", equation)
-        equation_ti = ti.field(dtype=ti.f32, shape=(4,))
-        equation_ti.from_numpy(equation)
-        print("equation_ti", equation_ti)
-
-        return equation_ti
-
-    a_pot = get_equations(a.vertices, a.tets, a.potentials, a.pose, a_face_idx)
-    b_pot = get_equations(b.vertices, b.tets, b.potentials, b.pose, b_face_idx)
-    intersection_points = []
-    intersection_ti = ti.Vector.field(4, dtype=ti.f32, shape=())
-    for i in range(4):
-        intersection_ti[None][i] = a_pot[i] - b_pot[i]
-    intersection = intersection_ti.to_numpy()  # intersection \cdot x = 0
+    # The pressures of the two tets can only be equal where their ranges meet.
+    pots_a = a.mesh.potentials_np[a.mesh.tets_np[a_face_idx]]
+    pots_b = b.mesh.potentials_np[b.mesh.tets_np[b_face_idx]]
+    if pots_a.min() > pots_b.max() or pots_b.min() > pots_a.max():
+        profiling.count("culled_potential")
+        return []
+
+    # The potential of each tet is precomputed in its body frame, so this is
+    # just a lookup followed by a change of frame.
+    dtype = wider(a.precision, b.precision).compute_np
+    a_pot = transform_equations(a.pose_np, a.mesh.equations_np[a_face_idx])
+    b_pot = transform_equations(b.pose_np, b.mesh.equations_np[b_face_idx])
+    intersection = (a_pot - b_pot).astype(dtype)  # intersection \cdot x = 0
     if (
-        intersection_ti[None][0] ** 2
-        + intersection_ti[None][1] ** 2
-        + intersection_ti[None][2] ** 2
-        < 1e-6
+        intersection[:3] @ intersection[:3] < 1e-6
     ):  # something degenerate -- potential functions are linear shifts.
+        profiling.count("empty_pairs")
         return []
+    profiling.count("planes")
 
-    def isect_tet_plane(vertices, tets, face_idx, intersection_ti):
-        self_coords = ti.Vector.field(3, dtype=ti.f32, shape=(4,))
-        for i in range(4):
-            self_coords[i] = vertices[tets[face_idx][i]]
-        i_value = ti.field(
-            dtype=ti.f32, shape=(4,)
-        )  # the inner products of each vertex
-        for i in range(4):
-            i_value[i] = 0
-            for j in range(3):
-                i_value[i] += intersection_ti[None][j] * self_coords[i][j]
-            i_value[i] += intersection_ti[None][3]
-            # i_value[i] = np.dot(intersection, np.append(self_coords[i], 1.0))
-        intersection_points = ti.Vector.field(
-            3, dtype=ti.f32, shape=(6,)
-        )  # all intersection points
-        num_intersection_points = 0
-        for i in range(4):
-            for j in range(i, 4):
-                if i_value[i] * i_value[j] < 0:  # must be different signs
-                    frac = i_value[i] / (
-                        i_value[i] - i_value[j]
-                    )  # must be between 0 and 1
-                    for k in range(3):
-                        intersection_points[num_intersection_points][k] = (
-                            1 - frac
-                        ) * self_coords[i][k] + frac * self_coords[j][k]
-                    num_intersection_points += 1
-        return intersection_points, num_intersection_points
-
-    points_A, pts_A = isect_tet_plane(a.vertices, a.tets, a_face_idx, intersection_ti)
-    points_B, pts_B = isect_tet_plane(b.vertices, b.tets, b_face_idx, intersection_ti)
-    points_A = points_A.to_numpy()[:pts_A]
-    points_B = points_B.to_numpy()[:pts_B]
-    print("points_A", points_A)
-    print("points_B", points_B)
-    zproj = False
-    yproj = False
-    xproj = False
-    if intersection_ti[None][2] != 0:
-        twoDproj = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
-        zproj = True
-    elif intersection_ti[None][1] != 0:
-        twoDproj = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
-        yproj = True
-    elif intersection_ti[None][0] != 0:
-        twoDproj = np.array([[0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
-        xproj = True
-    print("twoDproj.shape", twoDproj.shape)
-    print("points_A.shape", points_A.shape)
-    print("points_B.shape", points_B.shape)
-    A_2D = twoDproj @ points_A.T
-    B_2D = twoDproj @ points_B.T
-    print("A_2D", A_2D)
-    print("B_2D", B_2D)
-
-    APolygon = Polygon(map(tuple, list(A_2D.T)))
-    BPolygon = Polygon(map(tuple, list(B_2D.T)))
-    print(APolygon, BPolygon)
-    res = APolygon.intersection(BPolygon).exterior.coords
+    points_A = _tet_plane_points(a, a_face_idx, intersection)
+    points_B = _tet_plane_points(b, b_face_idx, intersection)
+    # Project along the dominant axis of the plane normal, so that the inverse
+    # projection below is well conditioned even for nearly parallel planes.
+    axis = np.argmax(np.abs(intersection[:3]))
+    plane_axes = [k for k in range(3) if k != axis]
+
+    with profiling.stage("clip"):
+        res = intersect_convex(points_A[:, plane_axes], points_B[:, plane_axes])
 
     if len(res) == 0:
+        profiling.count("empty_pairs")
         return []
-    else:
-        final_res = []
-        if zproj:
-            print("zproj")
-            for i in res:
-                final_res.append(
-                    (
-                        i[0],
-                        i[1],
-                        (
-                            -intersection_ti[None][3]
-                            - i[0] * intersection_ti[None][0]
-                            - i[1] * intersection_ti[None][1]
-                        )
-                        / intersection_ti[None][2],
-                    )
-                )
-        if yproj:
-            print("yproj")
-            for i in res:
-                final_res.append(
-                    (
-                        i[0],
-                        (
-                            -intersection_ti[None][3]
-                            - i[0] * intersection_ti[None][0]
-                            - i[1] * intersection_ti[None][2]
-                        )
-                        / intersection_ti[None][1],
-                        i[1],
-                    )
-                )
-        if xproj:
-            for i in res:
-                final_res.append(
-                    (
-                        (
-                            -intersection_ti[None][3]
-                            - i[0] * intersection_ti[None][1]
-                            - i[1] * intersection_ti[None][2]
-                        )
-                        / intersection_ti[None][0],
-                        i[0],
-                        i[1],
-                    )
-                )
-
-        return final_res
+    profiling.count("polygons")
+    res = np.vstack((res, res[:1]))  # close the polygon
+    final_res = np.zeros((len(res), 3), dtype=res.dtype)
+    final_res[:, plane_axes] = res
+    final_res[:, axis] = (
+        -intersection[3] - res @ intersection[plane_axes]
+    ) / intersection[axis]
+    return [tuple(point) for point in final_res]
+
+
+def _tet_plane_points(obj, face_idx, plane):
+    """
+    returns the (N, 3) points where the edges of a posed tet cross a plane, in
+    the dtype of the plane
+    """
+    mesh = obj.mesh
+    coords = transform_points(obj.pose_np, mesh.vertices_np[mesh.tets_np[face_idx]])
+    coords = coords.astype(plane.dtype)
+    values = coords @ plane[:3] + plane[3]  # signed distances, up to scale
+    i, j = np.triu_indices(4, 1)
+    crossing = values[i] * values[j] < 0  # must be different signs
+    i, j = i[crossing], j[crossing]
+    frac = (values[i] / (values[i] - values[j]))[:, None]  # between 0 and 1
+    return (1 - frac) * coords[i] + frac * coords[j]
 
 
 def triangulate_polygon(vertices):
@@ -221,66 +237,135 @@ def triangulate_polygon(vertices):
     given out-of-order coordinates of vertices of a planar and convex polygon in an Nx3 np array, output a triangulation
     of the polygon
     """
-    N = vertices.shape[0]
-    com = np.mean(
-        vertices, axis=0
-    )  # get center of mass of polygon for convenient interior point
-    angles = [(0, 0)]  # list of (angle, vtx index corresponding to angle)
-    displacements = vertices - com
-    mags = np.linalg.norm(displacements, axis=1)
-    ind = 1
-    normal = np.cross(
-        displacements[0], displacements[ind]
-    )  # compute any normal to the plane
-    while np.linalg.norm(normal) < 1e-6 * mags[0] * mags[ind]:
-        ind += 1
-        normal = np.cross(displacements[0], displacements[ind])
-    initial_disp = displacements[0, :]
-    for ind in range(1, N):
-        disp = displacements[ind, :]
-        angle = np.arccos(np.dot(disp, initial_disp) / (mags[0] * mags[ind]))
-        if np.dot(np.cross(disp, initial_disp), normal) < 0:
-            angle = 2 * math.pi - angle
-        angles.append((angle, ind))
-    angles.sort()
+    triangles, _ = triangulate_polygons(np.asarray(vertices)[None])
     # 0, 1, 2; 0, 2, 3;, 0, 3, 4 ..., 0, n-2, n-1
-    return [(0, angles[i][1], angles[i + 1][1]) for i in range(1, N - 1)]
+    return [tuple(t) for t in triangles[0].tolist()]
+
+
+def triangulate_polygons(polygons, counts=None):
+    """
+    batched version of `triangulate_polygon` for a padded (P, M, 3) array of convex
+    polygons, of which polygon k has `counts[k]` vertices (all M by default);
+    returns (P, M - 2, 3) fans of vertex indices along with a (P, M - 2) mask of
+    the triangles that exist
+    """
+    polygons = np.asarray(polygons, dtype=np.float64)
+    n, m, _ = polygons.shape
+    counts = np.full(n, m) if counts is None else np.asarray(counts)
+    valid = np.arange(m)[None, :] < counts[:, None]
+    com = np.sum(polygons * valid[..., None], axis=1)
+    com /= np.maximum(counts, 1)[:, None]  # convenient interior point
+    displacements = polygons - com[:, None]
+    mags = np.linalg.norm(displacements, axis=2)
+
+    # any normal to the plane, from the first vertex not in line with vertex 0
+    crosses = np.cross(displacements[:, :1], displacements)
+    independent = np.linalg.norm(crosses, axis=2) >= 1e-6 * mags[:, :1] * mags
+    independent &= valid
+    independent[:, 0] = False
+    normal = crosses[np.arange(n), np.argmax(independent, axis=1)]
+
+    # angles from vertex 0 in the plane basis (u, w), turning away from the normal
+    u = displacements[:, 0]
+    w = np.cross(normal, u)
+    angles = np.arctan2(
+        -np.einsum("nmi,ni->nm", displacements, w),
+        np.einsum("nmi,ni->nm", displacements, u),
+    ) % (2 * math.pi)
+    angles[:, 0] = -1
+    angles[~valid] = np.inf
+    order = np.argsort(angles, axis=1, kind="stable")
+
+    t = max(m - 2, 0)
+    triangles = np.stack(
+        [np.zeros((n, t), dtype=order.dtype), order[:, 1 : t + 1], order[:, 2:]],
+        axis=2,
+    )
+    return triangles, np.arange(2, t + 2)[None, :] < counts[:, None]
+
+
+def pressure_equations(verts, potentials, tets):
+    """
+    compute the linear potential (gx, gy, gz, d) with u(x) = g . x + d over every
+    tet at once, as an (n_tets, 4) array; degenerate tets get all zeros
+    """
+    coords = tet_coords(verts, tets)
+    pots = np.asarray(potentials, dtype=np.float64)[np.asarray(tets).reshape(-1, 4)]
+    edges = coords[:, 1:] - coords[:, :1]  # (n, 3, 3)
+    valid = np.abs(np.linalg.det(edges)) > 1e-12
+    equations = np.zeros((len(coords), 4))
+    grads = np.linalg.solve(
+        edges[valid], (pots[valid, 1:] - pots[valid, :1])[..., None]
+    )
+    equations[valid, :3] = grads[..., 0]
+    equations[valid, 3] = pots[valid, 0] - np.einsum(
+        "ni,ni->n", grads[..., 0], coords[valid, 0]
+    )
+    return equations
+
+
+def integrate_pressure(polygon, equation):
+    """
+    integrate the linear pressure `equation` exactly over a planar convex polygon,
+    returning its (area, centroid, total pressure)
+    """
+    polygon = np.asarray(polygon, dtype=np.float64)
+    if len(polygon) < 3:
+        return 0.0, np.zeros(3), 0.0
+    tris = polygon[np.array(triangulate_polygon(polygon))]  # (T, 3, 3)
+    areas = 0.5 * np.linalg.norm(
+        np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0]), axis=1
+    )
+    area = areas.sum()
+    if area <= 0:
+        return 0.0, polygon.mean(axis=0), 0.0
+    centroid = areas @ tris.mean(axis=1) / area
+    # pressure is linear, so its mean over the polygon is its value at the centroid
+    return area, centroid, area * (equation[:3] @ centroid + equation[3])
+
+
+def integrate_pressures(polygons, counts, equations):
+    """
+    batched version of `integrate_pressure` over a padded (P, M, 3) array of convex
+    polygons with `counts` vertices each and (P, 4) pressure equations, returning
+    (areas, centroids, totals) as arrays
+    """
+    polygons = np.asarray(polygons, dtype=np.float64)
+    equations = np.asarray(equations, dtype=np.float64)
+    counts = np.asarray(counts)
+    triangles, mask = triangulate_polygons(polygons, counts)
+    tris = polygons[np.arange(len(polygons))[:, None, None], triangles]  # (P, T, 3, 3)
+    areas = 0.5 * np.linalg.norm(
+        np.cross(tris[..., 1, :] - tris[..., 0, :], tris[..., 2, :] - tris[..., 0, :]),
+        axis=2,
+    )
+    areas *= mask
+    area = areas.sum(axis=1)
+    valid = (np.arange(polygons.shape[1])[None, :] < counts[:, None])[..., None]
+    mean = np.sum(polygons * valid, axis=1) / np.maximum(counts, 1)[:, None]
+    moment = np.einsum("pt,pti->pi", areas, tris.mean(axis=2))
+    live = area > 0
+    centroids = np.where(live[:, None], moment / np.where(live, area, 1)[:, None], mean)
+    centroids[counts < 3] = 0
+    totals = area * (
+        np.einsum("pi,pi->p", centroids, equations[:, :3]) + equations[:, 3]
+    )
+    return area, centroids, np.where(live, totals, 0.0)
 
 
 def pressure(A, B, i, j):
     """
-    compute overall pressure between two tets A[i], B[j] of objects A, B
+    compute overall pressure between two tets A[i], B[j] of objects A, B, as the
+    integral of the pressure of A over their intersection polygon
     """
     total_pressure = 0
-    intersection_polygon = intersect(A, B, i, j)
+    with profiling.stage("intersect"):
+        intersection_polygon = intersect(A, B, i, j)
     if len(intersection_polygon) > 0:
-        print(np.array(intersection_polygon[:-1]))
-        triangles = triangulate_polygon(np.array(intersection_polygon[:-1]))
-        vtx_coords = np.zeros((4, 3))
-        vtx_inds = []
-        for k in range(4):
-            ind = A.tets[i][k]
-            vtx_coords[k] = A.vertices[ind]
-            vtx_inds.append(ind)
-        vtx_coords = np.hstack(
-            (vtx_coords, np.ones((4, 1)))
-        ).T  # 4x4 matrix of vtxs padded w 1s
-        for x, y, z in triangles:
-            vtx1, vtx2, vtx3 = (
-                intersection_polygon[x],
-                intersection_polygon[y],
-                intersection_polygon[z],
-            )
-            com = np.array(
-                [(vtx1[k] + vtx2[k] + vtx3[k]) / 3 for k in range(3)]
-                + [
-                    1,
-                ]
-            )
-            res = np.linalg.solve(vtx_coords, com)
-            print("PRESSURE COMPUTATION")
-            print(res)
-            print(x, y, z)
-            for k in range(4):
-                total_pressure += res[k] * A.potentials[vtx_inds[k]]
+        polygon = np.array(intersection_polygon[:-1])
+        equation = transform_equations(A.pose_np, A.mesh.equations_np[i])
+        _, _, totals = integrate_pressures(
+            polygon[None], [len(polygon)], equation[None]
+        )
+        total_pressure = totals[0]
     return total_pressure
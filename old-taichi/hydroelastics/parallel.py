@@ -0,0 +1,190 @@
+"""
+Contact evaluation sharded across a pool of worker processes.
+
+Mesh arrays are copied once into shared memory and attached by the workers, so
+only the object poses and slices of the tet pair list are sent with each call.
+Workers evaluate their shard in NumPy (float64) with the same steps as the
+contact kernels, and the main process sums the partial wrenches in shard order.
+Shards have a fixed size, so the result does not depend on the worker count.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from .bvh import candidate_pairs
+from .clip import clip_polygons
+from .cull import cull_pairs
+from .forces import ForceResult
+
+
+def cross_sections(coords, planes):
+    """
+    Ordered cross-sections of (P, 4, 3) tets with (P, 4) planes, as a padded
+    (P, 4, 3) array of polygons and their vertex counts.
+    """
+    n = len(coords)
+    rows = np.arange(n)
+    side = np.einsum("pvi,pi->pv", coords, planes[:, :3]) + planes[:, 3:]
+    out = np.zeros((n, 4, 3))
+    counts = np.zeros(n, dtype=np.int64)
+    for j in range(4):
+        for k in range(j + 1, 4):
+            sj, sk = side[:, j], side[:, k]
+            cross = (sj > 0) != (sk > 0)
+            t = sj[cross] / (sj[cross] - sk[cross])
+            pj, pk = coords[cross, j], coords[cross, k]
+            out[rows[cross], counts[cross]] = pj + t[:, None] * (pk - pj)
+            counts += cross
+    # Crossing edges come out in lexicographic order, which for a 2-2 split of
+    # the vertices always has the last two corners swapped.
+    quad = counts == 4
+    out[quad, 2], out[quad, 3] = out[quad, 3], out[quad, 2].copy()
+    return out, counts
+
+
+def pair_wrenches(coords_a, eq_a, coords_b, eq_b, com_a, com_b):
+    """
+    Force on A and its point of application for every tet pair, given world
+    frame (P, 4, 3) tet coordinates and (P, 4) equations. NumPy version of
+    `PairWorkspace.run` followed by `PairWorkspace.integrate`.
+    """
+    planes = eq_a - eq_b
+    normals = planes[:, :3]
+    polygons, counts = cross_sections(coords_a, planes)
+    counts[np.sum(normals**2, axis=1) < 1e-6] = 0
+    for k in range(4):
+        a = coords_b[:, (k + 1) % 4]
+        n = np.cross(coords_b[:, (k + 2) % 4] - a, coords_b[:, (k + 3) % 4] - a)
+        inward = np.einsum("pi,pi->p", n, coords_b[:, k] - a) < 0
+        n[inward] = -n[inward]
+        face = np.concatenate([n, -np.einsum("pi,pi->p", n, a)[:, None]], axis=1)
+        polygons, counts = clip_polygons(polygons, counts, face)
+
+    # Fan triangulation from the first vertex, as in the kernel.
+    p0 = polygons[:, :1]
+    p1, p2 = polygons[:, 1:-1], polygons[:, 2:]
+    valid = np.arange(2, polygons.shape[1])[None, :] < counts[:, None]
+    tri_area = 0.5 * np.linalg.norm(np.cross(p1 - p0, p2 - p0), axis=2) * valid
+    tri_center = (p0 + p1 + p2) / 3
+    area = tri_area.sum(axis=1)
+    value = np.einsum("pti,pi->pt", tri_center, eq_a[:, :3]) + eq_a[:, 3:]
+    total = np.sum(value * tri_area, axis=1)
+    moment = np.einsum("pt,pti->pi", tri_area, tri_center)
+
+    live = area >= 1e-9
+    unit = normals / np.maximum(np.linalg.norm(normals, axis=1), 1e-30)[:, None]
+    unit[unit @ (com_a - com_b) < 0] *= -1
+    forces = np.where(live[:, None], total[:, None] * unit, 0.0)
+    centers = np.where(live[:, None], moment / np.where(live, area, 1)[:, None], 0.0)
+    return forces, centers
+
+
+class SharedMesh:
+    """Copies of the host arrays of a mesh in shared memory blocks."""
+
+    def __init__(self, mesh):
+        self.mesh = mesh  # keeps the mesh, and so its id, alive
+        self.blocks = []
+        self.arrays = {}
+        for name in ("vertices_np", "tets_np", "equations_np"):
+            arr = getattr(mesh, name)
+            block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, arr.dtype, buffer=block.buf)[:] = arr
+            self.blocks.append(block)
+            self.arrays[name] = (block.name, arr.shape, arr.dtype.str)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+# Shared memory attached by a worker process, by block name.
+_attached = {}
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    if name not in _attached:
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, np.dtype(dtype), buffer=_attached[name].buf)
+
+
+def _gather(mesh, pose, idx):
+    # Only the vertices of the gathered tets are converted to float64.
+    coords = _attach(mesh["vertices_np"])[_attach(mesh["tets_np"])[idx]]
+    coords = coords.astype(np.float64) @ pose[:3, :3].T + pose[:3, 3]
+    eq = _attach(mesh["equations_np"])[idx]
+    grad = eq[:, :3] @ pose[:3, :3].T
+    return coords, np.concatenate([grad, (eq[:, 3] - grad @ pose[:3, 3])[:, None]], 1)
+
+
+def _shard(mesh_a, mesh_b, pose_a, pose_b, com_a, com_b, pairs):
+    """Partial (force on A, torque on A, torque on B) for one shard of pairs."""
+    coords_a, eq_a = _gather(mesh_a, pose_a, pairs[:, 0])
+    coords_b, eq_b = _gather(mesh_b, pose_b, pairs[:, 1])
+    forces, centers = pair_wrenches(coords_a, eq_a, coords_b, eq_b, com_a, com_b)
+    tau_a = np.cross(centers - com_a, forces)
+    tau_b = np.cross(centers - com_b, -forces)
+    return np.stack([forces.sum(axis=0), tau_a.sum(axis=0), tau_b.sum(axis=0)])
+
+
+class ShardedContact:
+    """
+    Process pool backend for `compute_force`, with `workers` processes (all
+    cores by default) and tet pairs split into shards of `shard_size`.
+    """
+
+    def __init__(self, workers: int = None, shard_size: int = 4096):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        # Spawned rather than forked, since the parent runs Taichi threads.
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=get_context("spawn"))
+        self.meshes = {}
+
+    def share(self, mesh) -> dict:
+        if id(mesh) not in self.meshes:
+            self.meshes[id(mesh)] = SharedMesh(mesh)
+        return self.meshes[id(mesh)].arrays
+
+    def compute_force(self, A, B, pairs=None) -> ForceResult:
+        """Same as `forces.compute_force`, evaluated on the process pool."""
+        if pairs is None:
+            pairs = candidate_pairs(A, B)
+        pairs = cull_pairs(A, B, pairs)
+        mesh_a, mesh_b = self.share(A.mesh), self.share(B.mesh)
+        com_a, com_b = A.world_com(), B.world_com()
+        futures = [
+            self.pool.submit(
+                _shard,
+                mesh_a,
+                mesh_b,
+                A.pose_np,
+                B.pose_np,
+                com_a,
+                com_b,
+                pairs[start : start + self.shard_size],
+            )
+            for start in range(0, len(pairs), self.shard_size)
+        ]
+        wrench = np.zeros((3, 3))
+        for future in futures:  # in shard order, so sums are reproducible
+            wrench += future.result()
+        force, tau_AB, tau_BA = wrench
+        return ForceResult(force, -force, tau_AB, tau_BA)
+
+    def close(self):
+        self.pool.shutdown()
+        for shared in self.meshes.values():
+            shared.close()
+        self.meshes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
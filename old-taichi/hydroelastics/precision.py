@@ -0,0 +1,65 @@
+"""
+Floating point precision policy for meshes and contact kernels.
+
+A policy names the type that mesh data is stored in and the type that contact
+kernels compute and accumulate in:
+
+- "f32": float32 storage and arithmetic, the fastest;
+- "f64": float64 storage and arithmetic, the most accurate;
+- "mixed": float32 storage with float64 contact arithmetic, which keeps mesh
+  memory small while avoiding cancellation on thin contact slivers.
+
+Meshes take the default policy unless given one, and contact kernels use the
+wider of the two objects' policies.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import taichi as ti
+
+
+class Precision(NamedTuple):
+    name: str
+    storage: object  # Taichi type of mesh fields
+    compute: object  # Taichi type of contact kernel arithmetic
+
+    @property
+    def storage_np(self):
+        return np.float64 if self.storage == ti.f64 else np.float32
+
+    @property
+    def compute_np(self):
+        return np.float64 if self.compute == ti.f64 else np.float32
+
+
+F32 = Precision("f32", ti.f32, ti.f32)
+F64 = Precision("f64", ti.f64, ti.f64)
+MIXED = Precision("mixed", ti.f32, ti.f64)
+PRECISIONS = {p.name: p for p in (F32, F64, MIXED)}
+
+_default = F32
+
+
+def get_precision(precision=None) -> Precision:
+    """Look up a policy by name, or return the default one for None."""
+    if precision is None:
+        return _default
+    if isinstance(precision, Precision):
+        return precision
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"unknown precision {precision!r}, expected one of {list(PRECISIONS)}"
+        )
+    return PRECISIONS[precision]
+
+
+def set_precision(precision):
+    """Set the default policy used by meshes created from now on."""
+    global _default
+    _default = get_precision(precision)
+
+
+def wider(a: Precision, b: Precision) -> Precision:
+    """The policy of a, b with the wider compute type, preferring a on ties."""
+    return b if b.compute == ti.f64 and a.compute != ti.f64 else a
@@ -0,0 +1,124 @@
+"""
+Opt-in instrumentation for the contact pipeline.
+
+Hot paths call `stage(name)` around their steps and `count(name, n)` for the
+events they see. Both do nothing unless a `Profiler` is active:
+
+    with profile() as prof:
+        compute_force(a, b)
+    prof.save_json("profile.json")
+    prof.save_chrome_trace("trace.json")  # open in chrome://tracing or Perfetto
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+import taichi as ti
+
+_active = None
+
+
+class Profiler:
+    """
+    Collects per-stage timers and named counters.
+
+    Stages may nest, and every call is also kept as an event for the Chrome
+    trace. With `sync`, Taichi is synchronized when a stage ends, so that the
+    time of asynchronously launched kernels lands in the stage that ran them.
+    """
+
+    def __init__(self, sync: bool = False):
+        self.sync = sync
+        self.counters = defaultdict(int)
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.events = []
+        self.origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.sync:
+                ti.sync()
+            end = time.perf_counter()
+            self.times[name] += end - start
+            self.calls[name] += 1
+            self.events.append((name, start - self.origin, end - start))
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += int(n)
+
+    def to_dict(self):
+        return {
+            "stages": {
+                name: {"calls": self.calls[name], "total": self.times[name]}
+                for name in self.times
+            },
+            "counters": dict(self.counters),
+        }
+
+    def save_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def chrome_trace(self):
+        """Events in the Chrome trace event format, with times in microseconds."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration in self.events
+        ]
+        end = max((start + dur for _, start, dur in self.events), default=0.0)
+        events += [
+            {"name": name, "ph": "C", "ts": end * 1e6, "pid": pid, "args": {name: n}}
+            for name, n in self.counters.items()
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+@contextlib.contextmanager
+def profile(profiler: Profiler = None, sync: bool = False):
+    """Activate a profiler (a new one by default) for the duration of the block."""
+    global _active
+    previous = _active
+    _active = Profiler(sync=sync) if profiler is None else profiler
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def enabled() -> bool:
+    return _active is not None
+
+
+_null = contextlib.nullcontext()
+
+
+def stage(name: str):
+    """Time a block as stage `name` of the active profiler, if any."""
+    return _null if _active is None else _active.stage(name)
+
+
+def count(name: str, n: int = 1):
+    """Add `n` to counter `name` of the active profiler, if any."""
+    if _active is not None:
+        _active.count(name, n)
@@ -0,0 +1,89 @@
+"""
+Headless runs that stream snapshots of the simulation state to disk.
+
+Snapshots are copied from the device only every few steps, gathered into a
+chunk in host memory, and written a chunk at a time into a preallocated .npy
+file opened as a memory map. The result loads with `np.load(path)`, and
+`np.load(path, mmap_mode="r")` reads trajectories larger than memory.
+"""
+
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import taichi as ti
+
+
+class Trajectory:
+    """A preallocated (num_frames, *shape) array in a .npy file."""
+
+    def __init__(
+        self,
+        path,
+        num_frames: int,
+        shape: Tuple[int, ...],
+        dtype=np.float32,
+        chunk: int = 64,
+    ):
+        self.path = Path(path)
+        self.frames = np.lib.format.open_memmap(
+            self.path, mode="w+", dtype=dtype, shape=(num_frames, *shape)
+        )
+        self.chunk = np.empty((max(min(chunk, num_frames), 1), *shape), dtype=dtype)
+        self.written = 0
+        self.pending = 0
+
+    def append(self, frame):
+        if self.written + self.pending == len(self.frames):
+            raise IndexError(f"trajectory holds only {len(self.frames)} frames")
+        self.chunk[self.pending] = frame
+        self.pending += 1
+        if self.pending == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        end = self.written + self.pending
+        self.frames[self.written : end] = self.chunk[: self.pending]
+        self.frames.flush()
+        self.written, self.pending = end, 0
+
+    def close(self):
+        self.flush()
+        del self.frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record(
+    step: Callable[[], None],
+    snapshot: Callable[[], np.ndarray],
+    steps: int,
+    out=None,
+    every: int = 1,
+    chunk: int = 64,
+) -> Optional[np.ndarray]:
+    """
+    Call `step()` `steps` times, and save the initial `snapshot()` and one after
+    every `every` steps into `out`. Returns the saved trajectory as a read-only
+    memory map, or None if there is no `out`, in which case nothing is copied
+    from the device.
+    """
+    if out is None:
+        for _ in range(steps):
+            step()
+        ti.sync()
+        return None
+
+    first = snapshot()
+    num_frames = steps // every + 1
+    with Trajectory(out, num_frames, first.shape, first.dtype, chunk) as traj:
+        traj.append(first)
+        for i in range(1, steps + 1):
+            step()
+            if i % every == 0:
+                traj.append(snapshot())
+    return np.load(out, mmap_mode="r")
@@ -0,0 +1,140 @@
+"""
+One place to configure and initialize the Taichi runtime.
+
+Modules call `init()` before they create fields, instead of `ti.init()`. The
+runtime is initialized the first time, and later calls return the settings it
+was started with. Settings come from, in order of priority, the arguments of
+`init()`, earlier calls to `configure()` (such as the command line options of
+`main.py`), and these environment variables:
+
+- HYDROELASTICS_ARCH: "gpu" (the default), "cpu", "cuda", "vulkan", "metal"
+  or "opengl". A GPU arch falls back to the CPU when no such device exists.
+- HYDROELASTICS_THREADS: maximum number of CPU threads.
+- HYDROELASTICS_PRECISION: default precision policy, see `precision.py`.
+- HYDROELASTICS_OFFLINE_CACHE: "0" to stop caching compiled kernels on disk
+  under `cache_dir()`, so that later processes skip compilation.
+"""
+
+import os
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import taichi as ti
+
+from .precision import get_precision, set_precision
+
+ARCHS = {
+    "cpu": ti.cpu,
+    "gpu": ti.gpu,
+    "cuda": ti.cuda,
+    "vulkan": ti.vulkan,
+    "metal": ti.metal,
+    "opengl": ti.opengl,
+}
+
+
+class Config(NamedTuple):
+    arch: str
+    threads: Optional[int]
+    precision: str
+    offline_cache: bool
+
+
+_overrides = {}
+_config = None
+_prog = None
+
+
+def cache_dir() -> Path:
+    """Directory for generated meshes and kernels, set by $HYDROELASTICS_CACHE."""
+    default = Path.home() / ".cache" / "hydroelastics"
+    return Path(os.environ.get("HYDROELASTICS_CACHE", default))
+
+
+def configure(arch=None, threads=None, precision=None, offline_cache=None):
+    """Set defaults for the runtime before it is initialized."""
+    settings = dict(
+        arch=arch, threads=threads, precision=precision, offline_cache=offline_cache
+    )
+    _overrides.update({k: v for k, v in settings.items() if v is not None})
+
+
+def resolve(arch=None, threads=None, precision=None, offline_cache=None) -> Config:
+    """Combine arguments, `configure()` settings and the environment."""
+    env = os.environ
+
+    def pick(name, value, default):
+        if value is not None:
+            return value
+        if name in _overrides:
+            return _overrides[name]
+        return env.get(f"HYDROELASTICS_{name.upper()}", default)
+
+    arch = pick("arch", arch, "gpu").lower()
+    if arch not in ARCHS:
+        raise ValueError(f"unknown arch {arch!r}, expected one of {list(ARCHS)}")
+    threads = pick("threads", threads, None)
+    precision = get_precision(pick("precision", precision, "f32")).name
+    offline_cache = pick("offline_cache", offline_cache, True)
+    if isinstance(offline_cache, str):
+        offline_cache = offline_cache.lower() not in ("0", "false", "no", "off")
+    return Config(
+        arch=arch,
+        threads=None if threads is None else int(threads),
+        precision=precision,
+        offline_cache=bool(offline_cache),
+    )
+
+
+def current_program():
+    """
+    The running Taichi program, or None before `ti.init()`. A new one is made
+    every time Taichi is initialized, which drops all fields and kernels.
+
+    Taichi has no public API for this, so this is the one place that reaches
+    into its internals, falling back to None if they move.
+    """
+    try:
+        from taichi.lang import impl
+
+        return impl.get_runtime().prog
+    except (ImportError, AttributeError):
+        return None
+
+
+def init(**settings) -> Config:
+    """
+    Initialize Taichi if it is not running yet, and return the active settings.
+    Takes the same keyword arguments as `configure()`.
+    """
+    global _config, _prog
+    prog = current_program()
+    if _config is not None and prog is _prog:
+        return _config
+
+    config = resolve(**settings)
+    precision = get_precision(config.precision)
+    if prog is not None:
+        # Someone else called `ti.init()` already; keep their runtime.
+        set_precision(precision)
+        _config, _prog = config._replace(arch=current_arch()), prog
+        return _config
+
+    kwargs = dict(arch=ARCHS[config.arch], default_fp=precision.storage)
+    if config.threads is not None:
+        kwargs["cpu_max_num_threads"] = config.threads
+    # Older Taichi versions have no kernel cache to configure.
+    if tuple(ti.__version__) >= (1, 1, 0):
+        kwargs["offline_cache"] = config.offline_cache
+        if config.offline_cache:
+            kwargs["offline_cache_file_path"] = str(cache_dir() / "kernels")
+    ti.init(**kwargs)
+    set_precision(precision)
+    _config, _prog = config, current_program()
+    return _config
+
+
+def current_arch() -> str:
+    """Name of the arch Taichi actually runs on, after any fallback."""
+    arch = ti.cfg.arch
+    return next((k for k, v in ARCHS.items() if v == arch and k != "gpu"), str(arch))
@@ -0,0 +1,265 @@
+# This module contains implementations of common shapes, which can be used to
+# construct `Object`s from those shapes.
+
+import functools
+import inspect
+import os
+from itertools import permutations
+
+import numpy as np
+
+from .meshfile import load_mesh, save_mesh
+from .object import Object
+from .runtime import cache_dir
+
+
+def make_icosphere_mesh(order: int):
+    """
+    Utility function for constructing an icosphere triangle mesh, returning its
+    (vertices, triangles) as numpy arrays.
+
+    Adapted from https://observablehq.com/@mourner/fast-icosphere-mesh
+    """
+    # set up a 20-triangle icosahedron
+    f = (1 + 5**0.5) / 2
+    verts = np.array(
+        [
+            [-1, f, 0],
+            [1, f, 0],
+            [-1, -f, 0],
+            [1, -f, 0],
+            [0, -1, f],
+            [0, 1, f],
+            [0, -1, -f],
+            [0, 1, -f],
+            [f, 0, -1],
+            [f, 0, 1],
+            [-f, 0, -1],
+            [-f, 0, 1],
+        ],
+        dtype=np.float64,
+    )
+    tris = np.array(
+        [
+            [0, 11, 5],
+            [0, 5, 1],
+            [0, 1, 7],
+            [0, 7, 10],
+            [0, 10, 11],
+            [11, 10, 2],
+            [5, 11, 4],
+            [1, 5, 9],
+            [7, 1, 8],
+            [10, 7, 6],
+            [3, 9, 4],
+            [3, 4, 2],
+            [3, 2, 6],
+            [3, 6, 8],
+            [3, 8, 9],
+            [9, 8, 1],
+            [4, 9, 5],
+            [2, 4, 11],
+            [6, 2, 10],
+            [8, 6, 7],
+        ]
+    )
+    for _ in range(order):
+        # subdivide each triangle into 4 triangles, sharing edge midpoints
+        edges = np.sort(
+            np.concatenate((tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]])), axis=1
+        )
+        unique, inverse = np.unique(edges, axis=0, return_inverse=True)
+        a, b, c = len(verts) + inverse.reshape(3, -1)
+        verts = np.vstack((verts, verts[unique].mean(axis=1)))
+        v1, v2, v3 = tris.T
+        tris = np.stack(
+            (
+                np.stack((v1, a, c), axis=1),
+                np.stack((v2, b, a), axis=1),
+                np.stack((v3, c, b), axis=1),
+                np.stack((a, b, c), axis=1),
+            ),
+            axis=1,
+        ).reshape(-1, 3)
+    # normalize vertices
+    verts /= np.linalg.norm(verts, axis=1, keepdims=True)
+    return verts, tris
+
+
+def make_icosphere(order: int, radius: float = 1.0, mass: float = 1.0) -> Object:
+    """
+    Create an icosphere as a tetrahedral mesh, with potential 0 at the boundary.
+    """
+    verts, tris = make_icosphere_mesh(order)
+    points = radius * np.vstack((verts, np.zeros((1, 3))))  # add the origin
+    tets = np.hstack((tris, np.full((len(tris), 1), len(verts))))
+    potentials = np.zeros(len(points))
+    potentials[-1] = radius
+    return Object(verts=points, potentials=potentials, tets=tets, mass=mass)
+
+
+def make_cube(size: float = 1.0, mass: float = 1.0) -> Object:
+    """
+    Create a cube with center at the origin and side length `size`.
+    """
+    cube_verts = size * np.array(
+        [
+            (-0.5, -0.5, -0.5),
+            (-0.5, -0.5, 0.5),
+            (-0.5, 0.5, -0.5),
+            (-0.5, 0.5, 0.5),
+            (0.5, -0.5, -0.5),
+            (0.5, -0.5, 0.5),
+            (0.5, 0.5, -0.5),
+            (0.5, 0.5, 0.5),
+            (0.0, 0.0, 0.0),
+        ]
+    )
+    cube_tets = [
+        (0, 1, 2, 8),
+        (3, 1, 2, 8),
+        (0, 1, 5, 8),
+        (0, 4, 5, 8),
+        (0, 2, 6, 8),
+        (0, 4, 6, 8),
+        (7, 3, 6, 8),
+        (3, 2, 6, 8),
+        (7, 6, 5, 8),
+        (6, 5, 4, 8),
+        (3, 7, 1, 8),
+        (7, 5, 1, 8),
+    ]
+    cube_pots = [0.0] * 8 + [size / 2.0]
+    return Object(verts=cube_verts, potentials=cube_pots, tets=cube_tets, mass=mass)
+
+
+def cached_mesh(generator):
+    """
+    Cache the (verts, potentials, tets) arrays returned by a mesh generator on
+    disk, keyed by the generator name and its arguments. Cached meshes are
+    memory-mapped when loaded. Pass `cache=False` to always rebuild the mesh.
+    """
+    signature = inspect.signature(generator)
+
+    @functools.wraps(generator)
+    def wrapper(*args, cache: bool = True, **kwargs):
+        if not cache:
+            return generator(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = "-".join(
+            [generator.__name__] + [f"{k}={v!r}" for k, v in bound.arguments.items()]
+        )
+        path = cache_dir() / f"{key}.mesh"
+        if path.exists():
+            try:
+                return load_mesh(path)
+            except ValueError:
+                pass  # written by an older version, rebuild it
+        verts, potentials, tets = generator(*args, **kwargs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        save_mesh(tmp, verts, potentials, tets, dtype=np.float64)
+        os.replace(tmp, path)  # atomic, in case several processes race
+        return verts, potentials, tets
+
+    return wrapper
+
+
+def _grid_tets(shape):
+    """
+    Split every cell of a grid with `shape` vertices into 6 tets around its main
+    diagonal. Neighboring cells split their shared faces the same way, so the
+    tets form a conforming mesh. Vertices are numbered in C order.
+    """
+    nx, ny, nz = shape
+    strides = np.array([ny * nz, nz, 1])
+    cells = np.indices((nx - 1, ny - 1, nz - 1)).reshape(3, -1).T @ strides
+    tets = []
+    for a, b, _ in permutations(range(3)):
+        path = [0, strides[a], strides[a] + strides[b], strides.sum()]
+        tets.append(cells[:, None] + np.array(path)[None, :])
+    return np.concatenate(tets).astype(np.int64)
+
+
+def _ball_map(points):
+    """Map points of the cube [-1, 1]^3 onto the unit ball, radially."""
+    inf = np.abs(points).max(axis=1, keepdims=True)
+    two = np.linalg.norm(points, axis=1, keepdims=True)
+    return points * np.divide(inf, two, out=np.zeros_like(two), where=two > 0)
+
+
+@cached_mesh
+def box_mesh(size=(1.0, 1.0, 1.0), resolution: int = 4):
+    """
+    Tet mesh of a box centered at the origin, with `resolution` cells along each
+    axis and potential equal to the distance to the surface.
+    """
+    half = np.asarray(size, dtype=np.float64) / 2
+    t = np.linspace(-1.0, 1.0, resolution + 1)
+    grid = np.stack(np.meshgrid(t, t, t, indexing="ij"), axis=-1).reshape(-1, 3)
+    verts = grid * half
+    potentials = np.min(half - np.abs(verts), axis=1)
+    return verts, potentials, _grid_tets((resolution + 1,) * 3)
+
+
+@cached_mesh
+def sphere_mesh(radius: float = 1.0, resolution: int = 4):
+    """
+    Tet mesh of a ball centered at the origin, made by mapping a box mesh with
+    `resolution` cells per axis onto the ball. The potential is the distance to
+    the surface.
+    """
+    verts, _, tets = box_mesh((2.0, 2.0, 2.0), resolution, cache=False)
+    verts = radius * _ball_map(verts)
+    potentials = np.maximum(radius - np.linalg.norm(verts, axis=1), 0.0)
+    return verts, potentials, tets
+
+
+@cached_mesh
+def capsule_mesh(radius: float = 0.5, length: float = 1.0, resolution: int = 4):
+    """
+    Tet mesh of a capsule around the z axis: a cylinder of the given `length` and
+    `radius` with hemispherical caps, and potential equal to the distance to the
+    surface. `resolution` cells span the diameter, and the cylinder gets layers
+    of roughly the same height.
+    """
+    resolution += resolution % 2  # the equator must be a layer of the grid
+    layers = max(1, int(round(length / (2 * radius) * resolution)))
+    t = np.linspace(-1.0, 1.0, resolution + 1)
+    # Grid z coordinates of the lower cap, the cylinder and the upper cap, each
+    # with the offset that moves it into place along the axis.
+    mid = resolution // 2
+    z = np.concatenate((t[:mid], np.zeros(layers + 1), t[mid + 1 :]))
+    offset = np.concatenate(
+        (
+            np.full(mid, -length / 2),
+            np.linspace(-length / 2, length / 2, layers + 1),
+            np.full(mid, length / 2),
+        )
+    )
+    shape = (resolution + 1, resolution + 1, len(z))
+    ix, iy, iz = np.indices(shape).reshape(3, -1)
+    verts = radius * _ball_map(np.stack((t[ix], t[iy], z[iz]), axis=1))
+    verts[:, 2] += offset[iz]
+    # distance to the nearest point of the axis segment
+    dz = verts[:, 2] - np.clip(verts[:, 2], -length / 2, length / 2)
+    dist = np.sqrt(verts[:, 0] ** 2 + verts[:, 1] ** 2 + dz**2)
+    return verts, np.maximum(radius - dist, 0.0), _grid_tets(shape)
+
+
+def make_box(size=(1.0, 1.0, 1.0), resolution: int = 4, mass: float = 1.0) -> Object:
+    verts, potentials, tets = box_mesh(size, resolution)
+    return Object(verts=verts, potentials=potentials, tets=tets, mass=mass)
+
+
+def make_sphere(radius: float = 1.0, resolution: int = 4, mass: float = 1.0) -> Object:
+    verts, potentials, tets = sphere_mesh(radius, resolution)
+    return Object(verts=verts, potentials=potentials, tets=tets, mass=mass)
+
+
+def make_capsule(
+    radius: float = 0.5, length: float = 1.0, resolution: int = 4, mass: float = 1.0
+) -> Object:
+    verts, potentials, tets = capsule_mesh(radius, length, resolution)
+    return Object(verts=verts, potentials=potentials, tets=tets, mass=mass)
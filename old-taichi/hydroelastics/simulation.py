@@ -0,0 +1,229 @@
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import taichi as ti
+
+from .broadphase import SweepAndPrune
+from .coherence import ContactCache
+from .forces import compute_force
+from .object import Object
+from .parallel import ShardedContact
+from . import profiling
+from .runtime import init
+
+
+@ti.func
+def skew(w):
+    return ti.Matrix([[0.0, -w[2], w[1]], [w[2], 0.0, -w[0]], [-w[1], w[0], 0.0]])
+
+
+@ti.func
+def rotation_exp(w):
+    """
+    Exponential map on SO(3), see https://arwilliams.github.io/so3-exp.pdf.
+    """
+    theta = w.norm()
+    rot = ti.Matrix([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    if theta > 1e-9:
+        k = skew(w)
+        rot += (ti.sin(theta) / theta) * k
+        rot += ((1 - ti.cos(theta)) / theta**2) * (k @ k)
+    return rot
+
+
+@ti.data_oriented
+class World:
+    """
+    A scene of rigid objects, with the state of all bodies kept in
+    struct-of-arrays Taichi fields so that one kernel steps every body.
+
+    Objects are given as a dict from ids to `Object`s. The ids in `fixed` never
+    move, as if they had infinite mass. With `workers`, contact forces are
+    evaluated on a pool of that many processes instead of by Taichi kernels;
+    call `close`, or use the world as a context manager, to shut the pool down.
+    Unless `cache` is off, contact candidates are carried over between steps by
+    a `ContactCache` instead of being searched for from scratch.
+
+    Contact forces and torques are scaled by `stiffness` before they move the
+    bodies, like the factor of 100 in the Julia `simulate`.
+    """
+
+    def __init__(
+        self,
+        objects: Dict[str, Object],
+        fixed: Iterable[str] = (),
+        gravity=(0.0, 0.0, 0.0),
+        workers: int = 0,
+        cache: bool = True,
+        stiffness: float = 100.0,
+    ):
+        init()
+        self.ids = list(objects)
+        self.objects = [objects[id] for id in self.ids]
+        fixed = set(fixed)
+        n = len(self.objects)
+        self.n = n
+        self.stiffness = stiffness
+
+        self.position = ti.Vector.field(3, dtype=ti.f32, shape=(n,))  # world com
+        self.rotation = ti.Matrix.field(3, 3, dtype=ti.f32, shape=(n,))
+        self.velocity = ti.Vector.field(3, dtype=ti.f32, shape=(n,))
+        self.omega = ti.Vector.field(3, dtype=ti.f32, shape=(n,))
+        self.force = ti.Vector.field(3, dtype=ti.f32, shape=(n,))
+        self.torque = ti.Vector.field(3, dtype=ti.f32, shape=(n,))
+        self.inv_mass = ti.field(dtype=ti.f32, shape=(n,))
+        self.inv_inertia = ti.Matrix.field(3, 3, dtype=ti.f32, shape=(n,))  # body
+        self.body_com = ti.Vector.field(3, dtype=ti.f32, shape=(n,))
+        self.pose = ti.Matrix.field(4, 4, dtype=ti.f32, shape=(n,))
+        self.gravity = ti.Vector.field(3, dtype=ti.f32, shape=())
+
+        def upload(field, values):
+            field.from_numpy(np.asarray(values, dtype=np.float32))
+
+        is_fixed = [id in fixed for id in self.ids]
+        self.is_fixed = np.array(is_fixed, dtype=bool)
+        self.broadphase = SweepAndPrune()
+        self.contact_cache = ContactCache() if cache else None
+        self.contact = ShardedContact(workers) if workers else None
+        self.compute_force = compute_force
+        if self.contact is not None:
+            self.compute_force = self.contact.compute_force
+        upload(self.position, [o.world_com() for o in self.objects])
+        upload(self.rotation, [o.pose_np[:3, :3] for o in self.objects])
+        upload(self.velocity, np.zeros((n, 3)))
+        upload(self.omega, np.zeros((n, 3)))
+        upload(self.body_com, [o.com for o in self.objects])
+        upload(
+            self.inv_mass,
+            [0.0 if f else 1.0 / o.mass for o, f in zip(self.objects, is_fixed)],
+        )
+        upload(
+            self.inv_inertia,
+            [
+                np.zeros((3, 3)) if f else np.linalg.pinv(o.inertia)
+                for o, f in zip(self.objects, is_fixed)
+            ],
+        )
+        upload(self.pose, [o.pose_np for o in self.objects])
+        upload(self.gravity, gravity)
+
+    def close(self):
+        """Shut down the contact process pool and free its shared memory."""
+        if self.contact is not None:
+            self.contact.close()
+            self.contact = None
+            self.compute_force = compute_force
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def index(self, id: str) -> int:
+        return self.ids.index(id)
+
+    def set_velocity(self, id: str, v=None, omega=None):
+        """Set the linear and/or angular velocity of an object."""
+        i = self.index(id)
+        if v is not None:
+            self.velocity[i] = np.asarray(v, dtype=np.float32)
+        if omega is not None:
+            self.omega[i] = np.asarray(omega, dtype=np.float32)
+
+    def compute_wrenches(self):
+        """
+        Sum the contact forces and torques on every object, scaled by the
+        stiffness, as (n, 3) arrays.
+        """
+        forces = np.zeros((self.n, 3))
+        torques = np.zeros((self.n, 3))
+        for i, j in self.contact_pairs():
+            a, b = self.objects[i], self.objects[j]
+            pairs = None  # searched for by compute_force
+            if self.contact_cache is not None:
+                pairs = self.contact_cache.candidate_pairs(a, b, key=(i, j))
+            result = self.compute_force(a, b, pairs)
+            forces[i] += result.F_AB
+            forces[j] += result.F_BA
+            torques[i] += result.tau_AB
+            torques[j] += result.tau_BA
+        return self.stiffness * forces, self.stiffness * torques
+
+    def contact_pairs(self):
+        """Pairs of object indices whose bounding boxes overlap, except fixed pairs."""
+        bounds = [obj.world_bounds() for obj in self.objects]
+        lo, hi = zip(*bounds) if bounds else ((), ())
+        with profiling.stage("broadphase"):
+            pairs = self.broadphase.update(lo, hi)
+        profiling.count("object_pairs", len(pairs))
+        if self.contact_cache is not None:
+            for i, j in self.broadphase.removed:
+                self.contact_cache.discard((i, j))
+        return pairs[~(self.is_fixed[pairs[:, 0]] & self.is_fixed[pairs[:, 1]])]
+
+    @ti.kernel
+    def integrate(self, dt: ti.f32):
+        """
+        Advance every body by `dt` from its force and torque. This is the
+        symplectic Euler method: velocities are updated before positions.
+        """
+        for i in self.position:
+            rot = self.rotation[i]
+            if self.inv_mass[i] > 0:  # fixed objects ignore gravity
+                accel = self.inv_mass[i] * self.force[i] + self.gravity[None]
+                self.velocity[i] += dt * accel
+            inv_inertia = rot @ self.inv_inertia[i] @ rot.transpose()
+            self.omega[i] += dt * (inv_inertia @ self.torque[i])
+
+            # Rotate about the center of mass.
+            self.position[i] += dt * self.velocity[i]
+            rot = rotation_exp(dt * self.omega[i]) @ rot
+            self.rotation[i] = rot
+
+            t = self.position[i] - rot @ self.body_com[i]
+            for r in ti.static(range(3)):
+                for c in ti.static(range(3)):
+                    self.pose[i][r, c] = rot[r, c]
+                self.pose[i][r, 3] = t[r]
+            self.pose[i][3, 3] = 1.0
+
+    def step(
+        self, dt: float, forces: Optional[Callable[[np.ndarray, np.ndarray], None]]
+    ):
+        with profiling.stage("contact"):
+            f, tau = self.compute_wrenches()
+        if forces is not None:
+            forces(f, tau)
+        with profiling.stage("step"):
+            self.force.from_numpy(f.astype(np.float32))
+            self.torque.from_numpy(tau.astype(np.float32))
+            self.integrate(dt)
+            poses = self.pose.to_numpy()
+        for obj, pose in zip(self.objects, poses):
+            obj.set_pose(pose)
+        return poses
+
+
+def simulate(
+    world: World,
+    dt: float = 1e-3,
+    num_steps: int = 1000,
+    forces: Optional[Callable[[np.ndarray, np.ndarray], None]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate a world of objects for some number of iterations and fixed timestep.
+
+    This repeatedly applies the hydroelastic force model to each pair of objects
+    in the scene, returning the poses of each object over time as arrays of
+    shape (num_steps + 1, 4, 4). `forces(f, tau)` may add custom forces and
+    torques to the (n, 3) arrays of contact wrenches, in the order of `world.ids`.
+
+    The kinematics are implemented using a symplectic Euler method, which is more
+    numerically stable than forward Euler integration.
+    """
+    poses = np.zeros((num_steps + 1, world.n, 4, 4))
+    poses[0] = [obj.pose_np for obj in world.objects]
+    for step in range(num_steps):
+        poses[step + 1] = world.step(dt, forces)
+    return {id: poses[:, i] for i, id in enumerate(world.ids)}
@@ -1,7 +1,10 @@
+import numpy as np
 import taichi as ti
-from taichi_glsl import length, sqrt, cos, sin
 
-ti.init(arch=ti.gpu)
+from .recording import record
+from .runtime import init
+
+init()
 
 # Double Pendulum parameters
 a = 1.0
@@ -26,7 +29,6 @@ def initialize():
         cur_lengths[i] = 0.1
         pos[i] = ti.Vector([0.5 + 0.1 * float(i + 1), 0.9])
         vel[i] = ti.Vector([0.0, 0.0])
-    print("hello")
 
 
 @ti.kernel
@@ -43,9 +45,9 @@ def apply_pendulum_force():
         if i == 0:
             # apply force from first spring
             d = pos[0] - pivot
-            forces[i] -= (length(d) - rest_lengths[i]) * k_spring * d / length(d)
+            forces[i] -= (d.norm() - rest_lengths[i]) * k_spring * d / d.norm()
         d2 = pos[1] - pos[0]
-        second_force = (length(d2) - rest_lengths[1]) * k_spring * d2 / length(d2)
+        second_force = (d2.norm() - rest_lengths[1]) * k_spring * d2 / d2.norm()
         if i == 0:
             forces[i] += second_force
         else:
@@ -62,13 +64,113 @@ def advance(t: float):
         pos[i] += t * v
 
 
+def step():
+    apply_pendulum_force()
+    advance(1e-3)
+
+
+@ti.data_oriented
+class Ensemble:
+    """
+    A batch of independent double pendulums, stepped together by one launch of
+    each kernel. Every field has a leading batch dimension, and the parameters
+    are per-variant fields, so a parameter sweep saturates the cores instead of
+    paying the launch overhead once per variant.
+
+    Parameters are scalars or arrays of shape (batch,). Variants with the same
+    parameters and no `k_resistance` match the module-level pendulum.
+    """
+
+    def __init__(
+        self,
+        batch: int,
+        k_spring=k_spring,
+        k_resistance=0.0,
+        gravity=gravity,
+        rest_length=0.1,
+    ):
+        self.batch = batch
+        self.pos = ti.Vector.field(2, dtype=float, shape=(batch, 2))
+        self.vel = ti.Vector.field(2, dtype=float, shape=(batch, 2))
+        self.forces = ti.Vector.field(2, dtype=float, shape=(batch, 2))
+        self.pivot = ti.Vector.field(2, dtype=float, shape=(batch,))
+        self.k_spring = ti.field(dtype=float, shape=(batch,))
+        self.k_resistance = ti.field(dtype=float, shape=(batch,))
+        self.gravity = ti.field(dtype=float, shape=(batch,))
+        self.rest_lengths = ti.field(dtype=float, shape=(batch,))
+
+        dtype = self.pos.to_numpy().dtype
+        for field, value in [
+            (self.k_spring, k_spring),
+            (self.k_resistance, k_resistance),
+            (self.gravity, gravity),
+            (self.rest_lengths, rest_length),
+        ]:
+            field.from_numpy(np.broadcast_to(value, (batch,)).astype(dtype))
+        self.initialize()
+
+    def initialize(self, pos=None, vel=None, pivot=(0.5, 0.9)):
+        """
+        Set the state of every variant, from arrays of shape (batch, 2, 2) or
+        (2, 2) for the points and (batch, 2) or (2,) for the pivot. The points
+        start in a horizontal line to the right of the pivot by default.
+        """
+        dtype = self.pos.to_numpy().dtype
+        pivot = np.broadcast_to(pivot, (self.batch, 2)).astype(dtype)
+        if pos is None:
+            lengths = self.rest_lengths.to_numpy()
+            offsets = np.outer(lengths, [1, 2])[..., None] * [1.0, 0.0]
+            pos = pivot[:, None, :] + offsets
+        if vel is None:
+            vel = np.zeros((self.batch, 2, 2))
+        self.pivot.from_numpy(pivot)
+        self.pos.from_numpy(np.broadcast_to(pos, (self.batch, 2, 2)).astype(dtype))
+        self.vel.from_numpy(np.broadcast_to(vel, (self.batch, 2, 2)).astype(dtype))
+
+    @ti.kernel
+    def apply_pendulum_force(self):
+        """Fill in the `forces` field with gravity, damping and spring forces."""
+        for b, i in self.pos:
+            force = ti.Vector([0.0, -self.gravity[b]])
+            force -= self.k_resistance[b] * self.vel[b, i]
+            k, rest = self.k_spring[b], self.rest_lengths[b]
+            if i == 0:
+                d = self.pos[b, 0] - self.pivot[b]
+                force -= (d.norm() - rest) * k * d / d.norm()
+            d2 = self.pos[b, 1] - self.pos[b, 0]
+            second_force = (d2.norm() - rest) * k * d2 / d2.norm()
+            if i == 0:
+                force += second_force
+            else:
+                force -= second_force
+            self.forces[b, i] = force
+
+    @ti.kernel
+    def advance(self, t: float):
+        """Advance every variant by `t` units of time."""
+        for b, i in self.pos:
+            self.vel[b, i] += t * self.forces[b, i]
+            self.pos[b, i] += t * self.vel[b, i]
+
+    def step(self, t: float = 1e-3):
+        self.apply_pendulum_force()
+        self.advance(t)
+
+    def simulate(self, steps: int, t: float = 1e-3, out=None, every: int = 1):
+        """
+        Take `steps` steps, and return the final (batch, 2, 2) positions. With
+        `out`, also save (frames, batch, 2, 2) positions as in `record()`.
+        """
+        record(lambda: self.step(t), self.pos.to_numpy, steps, out=out, every=every)
+        return self.pos.to_numpy()
+
+
 def run():
     gui = ti.GUI("Double Pendulum", res=(600, 600))
     initialize()
     while gui.running:
         pos_np = pos.to_numpy()
         gui.circles(pivot.to_numpy().reshape((-1, 2)), radius=5)
-        print(pos_np)
         gui.circles(pos_np.reshape((-1, 2)), radius=5)
         gui.lines(
             pivot.to_numpy().reshape((-1, 2)),
@@ -83,5 +185,10 @@ def run():
         gui.show()
 
         for _ in range(5):
-            apply_pendulum_force()
-            advance(1e-3)
+            step()
+
+
+def simulate(steps: int = 1000, out=None, every: int = 1):
+    """Run without a GUI, saving (frames, 2, 2) positions into `out`."""
+    initialize()
+    return record(step, pos.to_numpy, steps, out=out, every=every)
@@ -0,0 +1,84 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .autodiff import DiffContact, twist_gradient
+from .forces import compute_force
+from .precision import get_precision, set_precision
+from .shapes import make_icosphere
+
+
+def rotation(omega):
+    """4x4 rotation about the origin by the rotation vector `omega`."""
+    angle = np.linalg.norm(omega)
+    skew = np.cross(np.eye(3), omega / angle)
+    pose = np.eye(4)
+    pose[:3, :3] = np.eye(3) + np.sin(angle) * skew
+    pose[:3, :3] += (1 - np.cos(angle)) * skew @ skew
+    return pose
+
+
+def test_diff_contact():
+    previous = get_precision()
+    set_precision("f64")
+    try:
+        a, b = make_icosphere(2), make_icosphere(2)
+    finally:
+        set_precision(previous)
+    b.translate([0.031, -0.05, 1.52])
+    contact = DiffContact(a, b)
+    contact.update()
+    assert contact.n > 0
+
+    # The forward pass agrees with the clipping pipeline.
+    expected = compute_force(a, b)
+    result = contact.compute_force()
+    for x, y in zip(result, expected):
+        assert np.allclose(x, y, atol=1e-9)
+
+    weights = np.array([[0.3, -0.2, 1.0], [0.1, 0.5, 0.0], [0.0, 0.2, -0.4]])
+    grads = contact.gradients(weights)
+    wrench = [result.F_AB, result.tau_AB, result.tau_BA]
+    assert np.isclose(grads.value, np.sum(weights * wrench))
+
+    def value(potentials=None, pose_b=None):
+        contact.set_potentials(potentials)
+        contact.set_poses(a.pose_np, b.pose_np if pose_b is None else pose_b)
+        r = contact.compute_force()
+        return np.sum(weights * [r.F_AB, r.tau_AB, r.tau_BA])
+
+    # Central differences with the same polygon faces.
+    eps = 1e-6
+    potentials = a.mesh.potentials_np.astype(np.float64)
+    for i in np.argsort(-np.abs(grads.potentials_a))[:3]:
+        step = np.zeros_like(potentials)
+        step[i] = eps
+        fd = (value(potentials + step) - value(potentials - step)) / (2 * eps)
+        assert np.isclose(grads.potentials_a[i], fd, rtol=1e-5, atol=1e-8)
+    contact.set_potentials(potentials)
+
+    d_omega, d_v = twist_gradient(b.pose_np, grads.pose_b)
+    for k in range(3):
+        step = np.eye(4)
+        step[k, 3] = eps
+        fd = value(pose_b=step @ b.pose_np) - value(
+            pose_b=np.linalg.inv(step) @ b.pose_np
+        )
+        assert np.isclose(d_v[k], fd / (2 * eps), rtol=1e-5, atol=1e-8)
+        omega = np.eye(3)[k] * eps
+        fd = value(pose_b=rotation(omega) @ b.pose_np)
+        fd -= value(pose_b=rotation(-omega) @ b.pose_np)
+        assert np.isclose(d_omega[k], fd / (2 * eps), rtol=1e-5, atol=1e-8)
+
+    # Separated objects have no contact and zero gradients.
+    b.translate([0.0, 0.0, 5.0])
+    contact = DiffContact(a, b)
+    contact.update()
+    grads = contact.gradients([0.0, 0.0, 1.0])
+    assert contact.n == 0 and grads.value == 0
+    assert not grads.potentials_a.any() and not grads.pose_b.any()
+
+
+test_diff_contact()
@@ -0,0 +1,39 @@
+import numpy as np
+
+from .broadphase import SweepAndPrune
+
+
+def brute_force(lo, hi):
+    return {
+        (i, j)
+        for i in range(len(lo))
+        for j in range(i + 1, len(lo))
+        if np.all(lo[i] <= hi[j]) and np.all(lo[j] <= hi[i])
+    }
+
+
+def test_sweep_and_prune():
+    rng = np.random.default_rng(0)
+    sap = SweepAndPrune()
+    assert len(sap.update(np.zeros((0, 3)), np.zeros((0, 3)))) == 0
+
+    centers = rng.uniform(0, 10, size=(200, 3))
+    size = rng.uniform(0.1, 1.0, size=(200, 3))
+    previous = set()
+    for step in range(10):
+        lo, hi = centers - size, centers + size
+        pairs = sap.update(lo, hi)
+        expected = brute_force(lo, hi)
+        assert set(map(tuple, pairs)) == expected
+        assert len(pairs) == len(expected)
+        assert set(map(tuple, sap.added)) == expected - previous
+        assert set(map(tuple, sap.removed)) == previous - expected
+        previous = expected
+        centers += rng.normal(scale=0.1, size=centers.shape)
+
+    # Touching boxes count as overlapping.
+    pairs = sap.update([(0, 0, 0), (1, 0, 0)], [(1, 1, 1), (2, 1, 1)])
+    assert pairs.tolist() == [[0, 1]]
+
+
+test_sweep_and_prune()
@@ -0,0 +1,45 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+# import the object class from object.py
+from .object import Object
+from .bvh import candidate_pairs, tet_bounds
+
+
+def random_object(rng, n_tets, offset):
+    verts = rng.random((4 * n_tets, 3)) * 0.2
+    verts += np.repeat(rng.random((n_tets, 3)), 4, axis=0) + offset
+    return Object(
+        verts=verts,
+        potentials=np.zeros(4 * n_tets),
+        tets=np.arange(4 * n_tets).reshape(-1, 4),
+        mass=1,
+    )
+
+
+def test_candidate_pairs():
+    rng = np.random.default_rng(0)
+    a = random_object(rng, 300, 0.0)
+    b = random_object(rng, 200, 0.5)
+    result = candidate_pairs(a, b)
+
+    lo_a, hi_a = tet_bounds(a.mesh.vertices_np, a.mesh.tets_np)
+    lo_b, hi_b = tet_bounds(b.mesh.vertices_np, b.mesh.tets_np)
+    overlap = np.all(
+        (lo_a[:, None] <= hi_b[None, :]) & (lo_b[None, :] <= hi_a[:, None]), axis=2
+    )
+    expected = np.argwhere(overlap)
+    assert len(expected) > 0
+    assert sorted(map(tuple, result)) == sorted(map(tuple, expected))
+
+    # moving B far away leaves no candidates, without touching the shared tree
+    c = b.instance()
+    c.translate([10.0, 0.0, 0.0])
+    assert len(candidate_pairs(a, c)) == 0
+    assert len(candidate_pairs(a, b)) == len(result)
+
+
+test_candidate_pairs()
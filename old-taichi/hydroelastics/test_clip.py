@@ -0,0 +1,44 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .clip import clip_polygons, intersect_convex, polygon_area
+
+
+def test_intersect_convex():
+    square = np.array([(0.0, 0.0), (1.0, 1.0), (1.0, 0.0), (0.0, 1.0)])  # unordered
+    shifted = square + np.array([0.5, 0.25])
+    res = intersect_convex(square, shifted)
+    assert len(res) == 4
+    assert np.abs(polygon_area(res) - 0.5 * 0.75) < 1e-12
+
+    # squares sharing an edge only touch, and a shared edge is parallel
+    assert len(intersect_convex(square, square + np.array([1.0, 0.0]))) == 0
+    assert np.abs(polygon_area(intersect_convex(square, square)) - 1.0) < 1e-12
+
+    # degenerate inputs give empty results instead of raising
+    segment = np.array([(0.0, 0.0), (1.0, 1.0), (0.5, 0.5)])
+    assert len(intersect_convex(square, segment)) == 0
+    assert len(intersect_convex(square, square[:2])) == 0
+
+
+def test_clip_polygons():
+    triangles = np.array(
+        [
+            [(0.0, 0.0), (2.0, 0.0), (0.0, 2.0)],
+            [(0.0, 0.0), (2.0, 0.0), (0.0, 2.0)],
+            [(0.0, 0.0), (2.0, 0.0), (0.0, 2.0)],
+        ]
+    )
+    # keep x <= 1, keep x >= 5, keep everything
+    planes = np.array([(-1.0, 0.0, 1.0), (1.0, 0.0, -5.0), (0.0, 1.0, 0.0)])
+    out, counts = clip_polygons(triangles, [3, 3, 3], planes)
+    assert list(counts) == [4, 0, 3]
+    assert np.abs(polygon_area(out[0, :4]) - 1.5) < 1e-12
+    assert np.abs(polygon_area(out[2, :3]) - 2.0) < 1e-12
+
+
+test_intersect_convex()
+test_clip_polygons()
@@ -0,0 +1,58 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .cloth import Cloth, grid_springs
+
+
+def test_grid_springs():
+    springs, diagonal = grid_springs(3, 4)
+    assert len(springs) == 2 * 4 + 3 * 3 + 2 * 2 * 3
+    assert diagonal.sum() == 2 * 2 * 3
+    assert len(set(map(tuple, np.sort(springs, axis=1)))) == len(springs)
+
+
+def test_cloth_forces():
+    # Spring forces cancel in pairs, so only gravity is left in the total.
+    cloth = Cloth(6, 7)
+    pos = cloth.initial_pos + np.random.default_rng(0).normal(0, 0.01, (42, 2))
+    cloth.pos.from_numpy(pos)
+    cloth.compute_forces()
+    forces = cloth.forces.to_numpy()
+    assert np.abs(forces).max() > 100
+    assert np.allclose(forces.sum(axis=0), [0.0, -9.8 * 42], atol=0.1)
+
+
+def test_cloth_step():
+    # Without gravity, a cloth at rest stays at rest.
+    cloth = Cloth(4, 5, gravity=0.0)
+    for implicit in (False, True):
+        cloth.step(1e-3, implicit=implicit)
+        assert np.allclose(cloth.pos.to_numpy(), cloth.initial_pos)
+
+    # Explicit and implicit steps agree for small timesteps.
+    explicit, implicit = Cloth(4, 5), Cloth(4, 5)
+    for _ in range(20):
+        explicit.step(1e-4)
+        implicit.step(1e-4, implicit=True)
+    assert np.allclose(explicit.positions(), implicit.positions(), atol=1e-4)
+    assert implicit.cg_iterations > 0
+
+    # Large implicit steps stay stable and settle with the corners pinned.
+    cloth = Cloth(16, 16)
+    for _ in range(200):
+        cloth.step(0.05, implicit=True)
+    pos = cloth.positions()
+    assert np.isfinite(pos).all()
+    assert np.allclose(
+        pos[0, [0, -1]], cloth.initial_pos.reshape(16, 16, 2)[0, [0, -1]]
+    )
+    assert pos[..., 1].min() > 0.0
+    assert np.abs(cloth.vel.to_numpy()).max() < 0.1
+
+
+test_grid_springs()
+test_cloth_forces()
+test_cloth_step()
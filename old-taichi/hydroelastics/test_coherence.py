@@ -0,0 +1,57 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .bvh import candidate_pairs, overlapping_pairs
+from .coherence import ContactCache
+from .shapes import make_icosphere
+
+
+def test_contact_cache():
+    a, b = make_icosphere(2), make_icosphere(2)
+    everything = np.stack(
+        np.meshgrid(np.arange(a.bvh.n_tets), np.arange(b.bvh.n_tets)), axis=-1
+    ).reshape(-1, 2)
+
+    def as_set(pairs):
+        return set(map(tuple, pairs.tolist()))
+
+    # The spheres start just apart and then touch. They stay within the margin
+    # of the first search, so the new contact is found without another one.
+    a.translate([0.0, -1.001, 0.0])
+    b.translate([0.0, 1.001, 0.0])
+    cache = ContactCache(margin=0.03)
+    for step in range(6):
+        pairs = cache.candidate_pairs(a, b)
+        expected = overlapping_pairs(a, b, everything)
+        assert as_set(pairs) == as_set(expected)
+        assert as_set(candidate_pairs(a, b)) <= as_set(pairs)
+        assert (len(pairs) > 0) == (step > 0)
+        a.translate([0.0, 0.004, 0.0])
+    assert (cache.hits, cache.misses) == (5, 1)
+
+    # Moving further than the margin searches again.
+    a.translate([0.0, 0.0, 0.05])
+    cache.candidate_pairs(a, b)
+    assert cache.misses == 2
+
+    # Only the most recently used object pairs are kept.
+    c = a.instance()
+    cache = ContactCache(capacity=1)
+    cache.candidate_pairs(a, b)
+    cache.candidate_pairs(c, b)
+    cache.candidate_pairs(a, b)
+    assert cache.stats()["evictions"] == 2
+    assert cache.misses == 3
+
+    # A hit on a kept pair also marks it as recently used.
+    cache = ContactCache(capacity=2)
+    for x in (a, c, a, a.instance()):
+        cache.candidate_pairs(x, b)
+    assert (id(a), id(b)) in cache.entries
+    assert (id(c), id(b)) not in cache.entries
+
+
+test_contact_cache()
@@ -1,9 +1,10 @@
 import os
 
-import taichi as ti
 import numpy as np
 
-ti.init(arch=ti.cpu)
+from .runtime import init
+
+init(arch="cpu")
 
 # import the object class from object.py
 from .object import Object
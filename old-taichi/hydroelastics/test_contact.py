@@ -0,0 +1,69 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+# import the object class from object.py
+from .object import Object, intersect
+from .contact import intersect_batch
+
+
+def test_intersect_batch():
+    obj = Object(
+        verts=[
+            (0.0, 0.0, 0.0),
+            (1.0, 0.0, 0.0),
+            (0.0, 1.0, 0.0),
+            (0.0, 0.0, 1.0),
+            (1.0, 1.0, 1.0),
+        ],
+        potentials=[0.0, 0.0, 0.0, 1.0, 0.5],
+        tets=[(0, 1, 2, 3), (1, 2, 3, 4)],
+        mass=1,
+    )
+    tet = Object(
+        verts=[
+            (0.2, 0.2, -0.5),
+            (1.0, 0.2, 1.2),
+            (0.2, 1.0, 1.2),
+            (-0.6, -0.6, 1.2),
+        ],
+        potentials=[1.0, 0.0, 0.0, 0.0],
+        tets=[(0, 1, 2, 3)],
+        mass=1,
+    )
+
+    pairs = np.array([(0, 0), (1, 0)])
+    planes, offsets, points = intersect_batch(obj, tet, pairs)
+    assert planes.shape == (2, 4)
+    assert offsets[0] == 0 and offsets[-1] == len(points)
+    for k, (i, j) in enumerate(pairs):
+        polygon = points[offsets[k] : offsets[k + 1]]
+        expected = np.array(intersect(obj, tet, i, j)[:-1])
+        assert len(polygon) == len(expected) >= 4
+        for p in polygon:
+            assert np.min(np.linalg.norm(expected - p, axis=1)) < 1e-4
+        assert np.all(np.abs(polygon @ planes[k, :3] + planes[k, 3]) < 1e-4)
+
+    # a tet against itself has a degenerate plane, and so an empty polygon
+    _, offsets, points = intersect_batch(obj, obj, [(0, 0)])
+    assert offsets[1] == 0 and len(points) == 0
+
+    # far apart tets have an empty polygon
+    far = Object(
+        verts=[
+            (10.2, 10.2, 9.5),
+            (11.0, 10.2, 11.2),
+            (10.2, 11.0, 11.2),
+            (9.4, 9.4, 11.2),
+        ],
+        potentials=[1.0, 0.0, 0.0, 0.0],
+        tets=[(0, 1, 2, 3)],
+        mass=1,
+    )
+    _, offsets, points = intersect_batch(obj, far, [(0, 0)])
+    assert offsets[1] == 0 and len(points) == 0
+
+
+test_intersect_batch()
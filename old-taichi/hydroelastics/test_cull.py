@@ -0,0 +1,61 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+# import the object class from object.py
+from .bvh import candidate_pairs
+from .contact import run_pairs
+from .cull import cull_pairs
+from .forces import compute_force
+from .object import Object
+from .profiling import profile
+from .shapes import make_box, make_icosphere
+
+
+def test_cull_pairs():
+    a, b = make_icosphere(2), make_box(resolution=4)
+    a.translate([0.2, -0.1, 1.3])
+    b.transform(
+        np.array([[0.8, -0.6, 0, 0], [0.6, 0.8, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+    )
+    pairs = np.concatenate([candidate_pairs(a, b), [(0, 0), (5, 7)]])
+    with profile() as prof:
+        kept = cull_pairs(a, b, pairs)
+    counters = prof.to_dict()["counters"]
+    assert counters["candidates"] == len(pairs)
+    assert counters["culled_plane"] > 0
+    culled = counters["culled_potential"] + counters["culled_plane"]
+    assert len(kept) == len(pairs) - culled
+
+    # Every pair with a contact force survives the cascade. Polygons lying on
+    # a zero-pressure face of A may be culled, as they carry no force.
+    ws = run_pairs(a, b, pairs)
+    ws.coms.from_numpy(np.array([a.world_com(), b.world_com()], dtype=np.float32))
+    ws.integrate(len(pairs))
+    forces = np.linalg.norm(ws.pair_forces.to_numpy()[: len(pairs)], axis=1)
+    contacts = set(map(tuple, pairs[forces > 1e-7].tolist()))
+    assert len(contacts) > 0
+    assert contacts <= set(map(tuple, kept.tolist()))
+
+    # The kernel makes the same tests itself, so culling first changes nothing.
+    for x, y in zip(compute_force(a, b, pairs), compute_force(a, b, kept)):
+        assert np.allclose(x, y, atol=1e-6)
+
+    # Tets whose potentials never meet are culled by the potential test.
+    tet = dict(
+        verts=[(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)],
+        tets=[(0, 1, 2, 3)],
+    )
+    low = Object(potentials=[0.0, 0.0, 0.0, 1.0], **tet)
+    high = Object(potentials=[2.0, 2.0, 2.0, 3.0], **tet)
+    with profile() as prof:
+        assert len(cull_pairs(low, high, [(0, 0)])) == 0
+        assert len(cull_pairs(low, low.instance(), [(0, 0)])) == 0
+    counters = prof.to_dict()["counters"]
+    assert counters["culled_potential"] == 1
+    assert counters["culled_plane"] == 1  # identical potentials have no plane
+
+
+test_cull_pairs()
@@ -0,0 +1,37 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from . import spring_pendulum
+from .spring_pendulum import Ensemble
+
+
+def test_ensemble():
+    steps = 200
+    single = spring_pendulum.simulate(steps)
+    assert single is None
+    expected = spring_pendulum.pos.to_numpy()
+
+    # Variants with the default parameters match the single pendulum.
+    stiffness = np.array([1e3, 1e3, 2e3, 5e2])
+    ensemble = Ensemble(4, k_spring=stiffness, k_resistance=[0.0, 0.0, 0.0, 1.0])
+    final = ensemble.simulate(steps)
+    assert final.shape == (4, 2, 2)
+    assert np.allclose(final[0], expected, atol=1e-5)
+    assert np.allclose(final[1], expected, atol=1e-5)
+    assert not np.allclose(final[2], expected, atol=1e-3)
+    assert not np.allclose(final[3], expected, atol=1e-3)
+
+    # Variants are independent of the rest of the batch.
+    alone = Ensemble(1, k_spring=2e3).simulate(steps)
+    assert np.allclose(alone[0], final[2], atol=1e-5)
+
+    # Per-variant initial states, such as a pendulum hanging at rest.
+    ensemble = Ensemble(2, gravity=0.0)
+    ensemble.initialize(pos=[[0.5, 0.8], [0.5, 0.7]])
+    assert np.allclose(ensemble.simulate(10), [[0.5, 0.8], [0.5, 0.7]])
+
+
+test_ensemble()
@@ -0,0 +1,51 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+# import the object class from object.py
+from .object import Object
+from .forces import compute_force
+
+
+def test_compute_force():
+    tet1 = Object(
+        verts=[
+            (0.0, 0.0, 0.0),
+            (1.0, 0.0, 0.0),
+            (0.0, 1.0, 0.0),
+            (0.0, 0.0, 1.0),
+        ],
+        potentials=[0.0, 0.0, 0.0, 1.0],
+        tets=[(0, 1, 2, 3)],
+        mass=1,
+    )
+    tet2 = Object(
+        verts=[
+            (0, 0, 2 - 0.2),
+            (1, 0, 2 - 0.2),
+            (0, 1, 2 - 0.2),
+            (0, 0, 1 - 0.2),
+        ],
+        potentials=[0.0, 0.0, 0.0, 1.0],
+        tets=[(0, 1, 2, 3)],
+        mass=1,
+    )
+
+    # the intersection is the triangle (0,0,.9), (.1,0,.9), (0,.1,.9) with
+    # pressure .9 everywhere, pushing tet1 down and away from tet2
+    result = compute_force(tet1, tet2)
+    force = np.array([0.0, 0.0, -0.9 * 0.005])
+    center = np.array([0.1 / 3, 0.1 / 3, 0.9])
+    assert np.allclose(result.F_AB, force, atol=1e-6)
+    assert np.allclose(result.F_BA, -force, atol=1e-6)
+    assert np.allclose(result.tau_AB, np.cross(center - tet1.com, force), atol=1e-6)
+    assert np.allclose(result.tau_BA, np.cross(center - tet2.com, -force), atol=1e-6)
+
+    swapped = compute_force(tet2, tet1)
+    assert np.allclose(swapped.F_AB, result.F_BA, atol=1e-6)
+    assert np.allclose(swapped.tau_AB, result.tau_BA, atol=1e-6)
+
+
+test_compute_force()
@@ -1,9 +1,10 @@
 import os
 
-import taichi as ti
 import numpy as np
 
-ti.init(arch=ti.cpu)
+from .runtime import init
+
+init(arch="cpu")
 
 # import the object class from object.py
 from .object import Object, intersect
@@ -49,5 +50,9 @@ def test_isect():
                 break
         assert close
 
+    # no Taichi fields are allocated per call, so repeated calls keep working
+    for _ in range(200):
+        assert np.allclose(intersect(tet1, tet2, 0, 0), final_res)
+
 
 test_isect()
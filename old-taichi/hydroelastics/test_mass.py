@@ -0,0 +1,49 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+# import the object class from object.py
+from .object import Object
+
+
+def test_mass_properties():
+    # unit cube with center (1, 2, 3), split into 12 tets around its center
+    verts = np.array(
+        [
+            (-0.5, -0.5, -0.5),
+            (-0.5, -0.5, 0.5),
+            (-0.5, 0.5, -0.5),
+            (-0.5, 0.5, 0.5),
+            (0.5, -0.5, -0.5),
+            (0.5, -0.5, 0.5),
+            (0.5, 0.5, -0.5),
+            (0.5, 0.5, 0.5),
+            (0.0, 0.0, 0.0),
+        ]
+    ) + np.array([1.0, 2.0, 3.0])
+    tets = [
+        (0, 1, 2, 8),
+        (3, 1, 2, 8),
+        (0, 1, 5, 8),
+        (0, 4, 5, 8),
+        (0, 2, 6, 8),
+        (0, 4, 6, 8),
+        (7, 3, 6, 8),
+        (3, 2, 6, 8),
+        (7, 6, 5, 8),
+        (6, 5, 4, 8),
+        (3, 7, 1, 8),
+        (7, 5, 1, 8),
+    ]
+    cube = Object(verts=verts, potentials=np.zeros(9), tets=tets, mass=6.0)
+    props = cube.mass_properties
+    assert np.abs(props.volume - 1.0) < 1e-9
+    assert np.allclose(props.volumes, 1 / 12)
+    assert np.allclose(cube.com, [1.0, 2.0, 3.0])
+    # I = m (a^2 + a^2) / 12 on each axis
+    assert np.allclose(cube.inertia, np.eye(3))
+
+
+test_mass_properties()
@@ -0,0 +1,38 @@
+import array
+
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+# import the object class from object.py
+from .object import Mesh, Object
+
+
+def test_mesh_upload():
+    verts = np.array(
+        [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)]
+    )
+    # any buffer-protocol object works, not only lists and arrays
+    potentials = array.array("d", [0.0, 0.0, 0.0, 1.0])
+    tets = memoryview(np.array([[0, 1, 2, 3]], dtype=np.int64))
+    mesh = Mesh(verts, potentials, tets)
+    assert np.allclose(mesh.vertices_np, verts)
+    assert np.allclose(mesh.potentials_np, potentials)
+    assert np.all(mesh.tets_np == [[0, 1, 2, 3]])
+
+    a = Object(mesh=mesh, mass=2.0)
+    b = a.instance(mass=4.0)
+    assert b.mesh is a.mesh and b.mesh.vertices_np is a.mesh.vertices_np
+    assert np.allclose(b.inertia, 2 * a.inertia)
+    assert np.allclose(a.com, [0.25, 0.25, 0.25])
+
+    # Meshes and objects allocate no Taichi fields, so there can be many.
+    objects = [Object(verts, potentials, tets) for _ in range(300)]
+    instances = [a.instance() for _ in range(1000)]
+    assert all(x.mesh is mesh for x in instances)
+    assert len({id(x.mesh) for x in objects}) == 300
+
+
+test_mesh_upload()
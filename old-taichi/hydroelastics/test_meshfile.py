@@ -0,0 +1,59 @@
+import os
+import tempfile
+
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .bvh import TetBVH
+from .meshfile import load_mesh, load_object, save_mesh
+from .object import Mesh
+from .shapes import box_mesh
+
+
+def test_meshfile():
+    verts, potentials, tets = box_mesh((1.0, 2.0, 3.0), 3, cache=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        check_meshfile(os.path.join(tmp, "box.mesh"), verts, potentials, tets)
+
+
+def check_meshfile(path, verts, potentials, tets):
+    save_mesh(path, verts, potentials, tets)
+
+    loaded = load_mesh(path)
+    assert all(isinstance(x, np.memmap) for x in loaded)
+    assert np.allclose(loaded[0], verts) and np.allclose(loaded[1], potentials)
+    assert np.array_equal(loaded[2], tets)
+    in_memory = load_mesh(path, mmap=False)
+    assert all(np.array_equal(x, y) for x, y in zip(loaded, in_memory))
+
+    # the mesh's host arrays are views of the mapped file, not copies
+    mesh = Mesh(*loaded)
+    assert np.shares_memory(mesh.vertices_np, loaded[0])
+    assert np.shares_memory(mesh.tets_np, loaded[2])
+
+    obj = load_object(path, mass=2.0)
+    assert np.allclose(obj.mesh.vertices_np, verts)
+    assert np.abs(obj.mass_properties.volume - 6.0) < 1e-5
+
+    # the derived data is read from the file rather than recomputed
+    assert isinstance(obj.bvh.lo, np.memmap)
+    assert isinstance(obj.mesh.equations_np, np.memmap)
+    bvh = TetBVH(verts, tets)
+    for name in TetBVH.ARRAYS:
+        assert np.array_equal(getattr(obj.bvh, name), getattr(bvh, name))
+    assert np.allclose(obj.mesh.equations_np, mesh.equations_np)
+    assert np.allclose(obj.inertia, 2.0 * mesh.mass_properties.inertia)
+
+    with open(path, "r+b") as f:
+        f.write(b"NOTAMESH")
+    try:
+        load_mesh(path)
+        assert False, "expected an error"
+    except ValueError:
+        pass
+
+
+test_meshfile()
@@ -0,0 +1,84 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .bvh import candidate_pairs
+from .contact import run_pairs
+from .forces import compute_force
+from .object import transform_equations, transform_points
+from .parallel import ShardedContact, pair_wrenches
+from .shapes import make_icosphere
+from .simulation import World
+
+
+def test_pair_wrenches():
+    a, b = make_icosphere(1), make_icosphere(1)
+    a.translate([0.1, -0.2, 0.8])
+    pairs = candidate_pairs(a, b)
+    ma, mb = a.mesh, b.mesh
+    coords_a = transform_points(a.pose_np, ma.vertices_np[ma.tets_np[pairs[:, 0]]])
+    coords_b = transform_points(b.pose_np, mb.vertices_np[mb.tets_np[pairs[:, 1]]])
+    eq_a = transform_equations(a.pose_np, ma.equations_np[pairs[:, 0]])
+    eq_b = transform_equations(b.pose_np, mb.equations_np[pairs[:, 1]])
+    forces, centers = pair_wrenches(
+        coords_a, eq_a, coords_b, eq_b, a.world_com(), b.world_com()
+    )
+
+    ws = run_pairs(a, b, pairs)
+    ws.coms.from_numpy(np.array([a.world_com(), b.world_com()], dtype=np.float32))
+    ws.integrate(len(pairs))
+    expected = ws.pair_forces.to_numpy()[: len(pairs)]
+    assert np.count_nonzero(np.any(forces != 0, axis=1)) > 0
+    assert np.allclose(forces, expected, atol=1e-4)
+
+
+def test_sharded_contact():
+    a, b = make_icosphere(2), make_icosphere(2)
+    a.translate([0.031, -0.05, 1.52])
+    expected = compute_force(a, b)
+
+    results = []
+    for workers in (1, 2):
+        with ShardedContact(workers, shard_size=64) as backend:
+            results.append(backend.compute_force(a, b))
+            # Posing an object again reuses the shared meshes.
+            a.translate([0.0, 0.0, 0.01])
+            backend.compute_force(a, b)
+            a.translate([0.0, 0.0, -0.01])
+            assert len(backend.meshes) == 2
+
+    scale = np.linalg.norm(expected.F_AB)
+    for result in results:
+        for x, y in zip(result, expected):
+            assert np.allclose(x, y, atol=1e-4 * scale)
+    # The reduction does not depend on the number of workers.
+    for x, y in zip(*results):
+        assert np.array_equal(x, y)
+
+    # A world releases its pool and shared memory when it is closed.
+    with World({"a": a, "b": b}, workers=1) as world:
+        forces, _ = world.compute_wrenches()
+        names = [
+            block.name
+            for shared in world.contact.meshes.values()
+            for block in shared.blocks
+        ]
+    assert world.contact is None and len(names) == 6
+    stiffness = world.stiffness
+    assert np.allclose(
+        forces[0], stiffness * expected.F_AB, atol=1e-4 * stiffness * scale
+    )
+    for name in names:
+        try:
+            shared_memory.SharedMemory(name=name)
+            assert False, "expected the block to be unlinked"
+        except FileNotFoundError:
+            pass
+
+
+test_pair_wrenches()
+test_sharded_contact()
@@ -0,0 +1,75 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+# import the object class from object.py
+from .object import Object, intersect, pressure
+from .bvh import candidate_pairs
+from .forces import compute_force
+
+
+def make_tets(shift):
+    tet1 = Object(
+        verts=[
+            (0.0, 0.0, 0.0),
+            (1.0, 0.0, 0.0),
+            (0.0, 1.0, 0.0),
+            (0.0, 0.0, 1.0),
+        ],
+        potentials=[0.0, 0.0, 0.0, 1.0],
+        tets=[(0, 1, 2, 3)],
+        mass=1,
+    )
+    tet2 = Object(
+        verts=np.array(
+            [
+                (0, 0, 2 - 0.2),
+                (1, 0, 2 - 0.2),
+                (0, 1, 2 - 0.2),
+                (0, 0, 1 - 0.2),
+            ]
+        )
+        + shift,
+        potentials=[0.0, 0.0, 0.0, 1.0],
+        tets=[(0, 1, 2, 3)],
+        mass=1,
+    )
+    return tet1, tet2
+
+
+def test_pose():
+    tet1, tet2 = make_tets(0.0)
+    expected = compute_force(tet1, tet2)
+
+    # the same configuration, with tet2 moved back into place by its pose
+    shift = np.array([5.0, 0.0, 0.0])
+    tet1, tet2 = make_tets(shift)
+    assert len(candidate_pairs(tet1, tet2)) == 0
+    tet2.translate(-shift)
+    assert len(candidate_pairs(tet1, tet2)) == 1
+    assert np.abs(pressure(tet1, tet2, 0, 0) - 0.9 * 0.005) < 1e-8
+    result = compute_force(tet1, tet2)
+    for x, y in zip(result, expected):
+        assert np.allclose(x, y, atol=1e-6)
+
+    # rotating the whole scene rotates the polygon, forces and torques
+    c, s = np.cos(0.3), np.sin(0.3)
+    rot = np.array([[c, -s, 0, 0], [s, c, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+    tet1.transform(rot)
+    tet2.transform(rot)
+    polygon = np.array(intersect(tet1, tet2, 0, 0)[:-1])
+    corners = np.array([(0, 0, 0.9), (0.1, 0, 0.9), (0, 0.1, 0.9)]) @ rot[:3, :3].T
+    assert len(polygon) == 3
+    for p in polygon:
+        assert np.min(np.linalg.norm(corners - p, axis=1)) < 1e-4
+    result = compute_force(tet1, tet2)
+    for x, y in zip(result, expected):
+        assert np.allclose(x, rot[:3, :3] @ y, atol=1e-6)
+
+    lo, hi = tet1.world_bounds()
+    assert np.all(lo <= corners.min(axis=0)) and np.all(hi >= corners.max(axis=0))
+
+
+test_pose()
@@ -0,0 +1,71 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+# import the object class from object.py
+from .bvh import candidate_pairs
+from .forces import compute_force
+from .object import Mesh, Object, transform_equations, transform_points
+from .parallel import pair_wrenches
+from .precision import F32, F64, MIXED, get_precision, set_precision
+from .shapes import make_icosphere
+
+
+def reference_force(a, b):
+    """Total force on A in float64 NumPy, for comparison."""
+    pairs = candidate_pairs(a, b)
+    ma, mb = a.mesh, b.mesh
+    forces, _ = pair_wrenches(
+        transform_points(a.pose_np, ma.vertices_np[ma.tets_np[pairs[:, 0]]]),
+        transform_equations(a.pose_np, ma.equations_np[pairs[:, 0]]),
+        transform_points(b.pose_np, mb.vertices_np[mb.tets_np[pairs[:, 1]]]),
+        transform_equations(b.pose_np, mb.equations_np[pairs[:, 1]]),
+        a.world_com(),
+        b.world_com(),
+    )
+    return forces.sum(axis=0)
+
+
+def test_precision():
+    assert get_precision("mixed") is MIXED
+    try:
+        get_precision("f16")
+        assert False
+    except ValueError:
+        pass
+
+    previous = get_precision()
+    try:
+        set_precision("f64")
+        a = make_icosphere(1)
+        set_precision("f32")
+        b, d = make_icosphere(1), make_icosphere(1)
+    finally:
+        set_precision(previous)
+    assert a.precision is F64
+    assert a.mesh.vertices_np.dtype == np.float64
+    assert b.precision is F32 and b.mesh.vertices_np.dtype == np.float32
+    mesh = b.mesh
+    mixed = Object(
+        mesh=Mesh(mesh.vertices_np, mesh.potentials_np, mesh.tets_np, "mixed")
+    )
+    assert mixed.mesh.vertices_np.dtype == np.float32
+    assert mixed.precision is MIXED
+    assert mixed.instance().precision is MIXED
+
+    for x in (a, b, mixed):
+        x.translate([0.031, -0.05, 1.52])
+    f64, f32 = compute_force(a, d).F_AB, compute_force(b, d).F_AB
+    expected = reference_force(a, d)
+    assert np.allclose(f64, expected, rtol=1e-9)
+    assert np.allclose(f32, expected, rtol=1e-4)
+    assert np.linalg.norm(f64 - expected) < np.linalg.norm(f32 - expected)
+    # Float32 storage with float64 arithmetic; the wider policy of the two wins.
+    expected = reference_force(mixed, d)
+    assert np.allclose(compute_force(mixed, d).F_AB, expected, rtol=1e-9)
+    assert np.allclose(compute_force(d, mixed).F_BA, expected, rtol=1e-9)
+
+
+test_precision()
@@ -1,9 +1,11 @@
-import taichi as ti
+import numpy as np
 
-ti.init(arch=ti.cpu)
+from .runtime import init
+
+init(arch="cpu")
 
 # import the object class from object.py
-from .object import Object, pressure
+from .object import Object, integrate_pressure, pressure
 
 
 def test_pressure():
@@ -32,9 +34,31 @@ def test_pressure():
 
     final_res = pressure(tet1, tet2, 0, 0)
     # from prev test we know the intersection is a triangle (0,0,.9), (.1, 0, .9), (0, .1, .9)
-    # so the weights on the vtxs of A should be .033, .033, .033, .9
-    print(final_res)
-    assert (final_res - 0.9) ** 2 < 1e-12
+    # with area .005, over which the pressure of A is .9 everywhere
+    assert (final_res - 0.9 * 0.005) ** 2 < 1e-12
+
+
+def test_integrate_pressure():
+    tet = Object(
+        verts=[
+            (0.0, 0.0, 0.0),
+            (1.0, 0.0, 0.0),
+            (0.0, 1.0, 0.0),
+            (0.0, 0.0, 1.0),
+        ],
+        potentials=[0.0, 0.0, 0.0, 1.0],
+        tets=[(0, 1, 2, 3)],
+        mass=1,
+    )
+    assert np.allclose(tet.mesh.equations_np[0], [0.0, 0.0, 1.0, 0.0])
+
+    # unit square at height .5, in scrambled order
+    square = np.array([(0, 0, 0.5), (1, 1, 0.5), (1, 0, 0.5), (0, 1, 0.5)])
+    area, centroid, total = integrate_pressure(square, tet.mesh.equations_np[0])
+    assert np.abs(area - 1.0) < 1e-12
+    assert np.allclose(centroid, [0.5, 0.5, 0.5])
+    assert np.abs(total - 0.5) < 1e-12
 
 
 test_pressure()
+test_integrate_pressure()
@@ -0,0 +1,53 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .forces import compute_force
+from .object import pressure
+from .profiling import count, profile, stage
+from .shapes import make_icosphere
+
+
+def test_profile():
+    a, b = make_icosphere(1), make_icosphere(1)
+    b.translate([0.0, 0.0, 1.5])
+
+    # Without an active profiler the hooks do nothing.
+    with stage("unused"):
+        count("unused")
+
+    out = io.StringIO()
+    with profile() as prof, contextlib.redirect_stdout(out):
+        compute_force(a, b)
+        pressure(a, b, 0, 0)
+    assert out.getvalue() == ""
+
+    stats = prof.to_dict()
+    assert {"candidate_pairs", "gather", "clip", "integrate", "intersect"} <= set(
+        stats["stages"]
+    )
+    assert "unused" not in stats["stages"]
+    counters = stats["counters"]
+    assert counters["pairs"] > 0
+    assert counters["polygons"] > 0
+    assert counters["pairs"] + 1 == counters["polygons"] + counters["empty_pairs"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prof.save_json(os.path.join(tmp, "profile.json"))
+        prof.save_chrome_trace(os.path.join(tmp, "trace.json"))
+        with open(os.path.join(tmp, "profile.json")) as f:
+            assert json.load(f) == json.loads(json.dumps(stats))
+        with open(os.path.join(tmp, "trace.json")) as f:
+            events = json.load(f)["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert len(spans) == sum(s["calls"] for s in stats["stages"].values())
+    assert all(e["dur"] >= 0 for e in spans)
+
+
+test_profile()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .cloth import Cloth, simulate
+from .recording import Trajectory, record
+
+
+def test_trajectory():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traj.npy")
+        with Trajectory(path, 7, (2, 3), chunk=3) as traj:
+            for i in range(7):
+                traj.append(np.full((2, 3), i))
+                assert traj.written == i + 1 - (i + 1) % 3
+        frames = np.load(path)
+        assert frames.shape == (7, 2, 3) and frames.dtype == np.float32
+        assert (frames[:, 0, 0] == np.arange(7)).all()
+
+        calls = []
+        result = record(lambda: calls.append(1), lambda: np.zeros(2), 10)
+        assert result is None and len(calls) == 10
+
+
+def test_simulate():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traj.npy")
+        frames = simulate(4, 5, steps=30, out=path, every=10)
+        assert isinstance(frames, np.memmap)
+        assert frames.shape == (4, 4, 5, 2)
+
+        cloth = Cloth(4, 5)
+        assert np.allclose(frames[0], cloth.positions())
+        for i in range(1, 31):
+            cloth.step(1e-3)
+            if i % 10 == 0:
+                assert np.allclose(frames[i // 10], cloth.positions())
+        del frames
+
+
+test_trajectory()
+test_simulate()
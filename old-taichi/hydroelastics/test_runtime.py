@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from . import runtime
+from .runtime import configure, init, resolve
+
+init(arch="cpu")
+
+
+def test_runtime():
+    # Initializing again keeps the running runtime and its fields.
+    prog = runtime.current_program()
+    config = init(arch="cpu")
+    assert init() is config
+    assert runtime.current_program() is prog
+    assert runtime.current_arch() == "cpu"
+
+    env = dict(os.environ)
+    try:
+        os.environ["HYDROELASTICS_ARCH"] = "CPU"
+        os.environ["HYDROELASTICS_THREADS"] = "3"
+        os.environ["HYDROELASTICS_OFFLINE_CACHE"] = "0"
+        assert resolve() == runtime.Config("cpu", 3, "f32", False)
+        configure(threads=2, precision="mixed")
+        assert resolve() == runtime.Config("cpu", 2, "mixed", False)
+        assert resolve(threads=1, offline_cache=True).threads == 1
+        assert resolve(threads=1, offline_cache=True).offline_cache
+        try:
+            resolve(arch="tpu")
+            assert False
+        except ValueError:
+            pass
+    finally:
+        os.environ.clear()
+        os.environ.update(env)
+        runtime._overrides.clear()
+
+
+FIRST_USE = """
+from hydroelastics.shapes import make_icosphere
+from hydroelastics.simulation import World, simulate
+
+a, b = make_icosphere(1), make_icosphere(1)
+b.translate([0.0, 0.0, 1.5])
+simulate(World({"a": a, "b": b}), dt=1e-3, num_steps=1)
+"""
+
+
+def test_first_use():
+    # The library starts the runtime itself when nothing initialized it.
+    env = dict(os.environ, HYDROELASTICS_ARCH="cpu")
+    root = Path(__file__).resolve().parent.parent
+    subprocess.run([sys.executable, "-c", FIRST_USE], cwd=root, env=env, check=True)
+
+
+test_runtime()
+test_first_use()
@@ -0,0 +1,58 @@
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .shapes import capsule_mesh, make_box, make_cube, make_icosphere, sphere_mesh
+
+
+def test_shapes():
+    sphere = make_icosphere(2, radius=2.0)
+    assert sphere.n_vert == 10 * 4**2 + 2 + 1
+    assert sphere.n_tets == 20 * 4**2
+    volume = sphere.mass_properties.volume
+    assert 0.9 * 4 / 3 * math.pi * 8 < volume < 4 / 3 * math.pi * 8
+    assert np.allclose(sphere.com, 0.0)
+
+    cube = make_cube(2.0)
+    assert np.abs(cube.mass_properties.volume - 8.0) < 1e-9
+    assert np.allclose(cube.com, 0.0)
+
+
+def test_generators():
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as cache:
+        try:
+            os.environ["HYDROELASTICS_CACHE"] = cache
+
+            box = make_box((1.0, 2.0, 3.0), resolution=4)
+            assert box.n_tets == 6 * 4**3
+            assert np.abs(box.mass_properties.volume - 6.0) < 1e-9
+            assert np.abs(box.mesh.potentials_np.max() - 0.5) < 1e-6
+
+            verts, potentials, tets = sphere_mesh(1.0, 8)
+            assert np.all(
+                np.abs(np.linalg.norm(verts, axis=1) + potentials - 1.0) < 1e-9
+            )
+            assert potentials.max() == 1.0
+
+            verts, potentials, tets = capsule_mesh(0.5, 1.0, 8)
+            assert np.abs(np.abs(verts[:, 2]).max() - 1.0) < 1e-9
+            assert np.all(potentials >= 0.0) and np.abs(potentials.max() - 0.5) < 1e-9
+
+            # the second call loads the cached arrays from disk
+            assert len(os.listdir(cache)) == 3
+            cached = capsule_mesh(0.5, 1.0, 8)
+            assert np.array_equal(cached[0], verts) and np.array_equal(cached[2], tets)
+        finally:
+            os.environ.clear()
+            os.environ.update(env)
+
+
+test_shapes()
+test_generators()
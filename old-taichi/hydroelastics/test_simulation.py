@@ -0,0 +1,73 @@
+import numpy as np
+
+from .runtime import init
+
+init(arch="cpu")
+
+from .shapes import make_cube, make_icosphere
+from .simulation import World, simulate
+
+
+def test_simulate():
+    dt, steps = 1e-2, 20
+
+    # A free fall, away from any other object.
+    a = make_icosphere(0)
+    world = World({"a": a}, gravity=(0.0, 0.0, -9.8))
+    poses = simulate(world, dt=dt, num_steps=steps)["a"]
+    assert poses.shape == (steps + 1, 4, 4)
+    # Symplectic Euler moves by dt^2 g (1 + 2 + ... + n) after n steps.
+    expected = -9.8 * dt**2 * steps * (steps + 1) / 2
+    assert np.isclose(poses[-1, 2, 3], expected, rtol=1e-4)
+    assert np.allclose(a.pose_np, poses[-1])
+
+    # A spin about the center of mass keeps the center in place.
+    b = make_icosphere(0)
+    b.translate([1.0, 2.0, 3.0])
+    world = World({"b": b})
+    world.set_velocity("b", omega=[0.0, 0.0, np.pi / 2])
+    poses = simulate(world, dt=dt, num_steps=100)["b"]
+    rotation = poses[-1, :3, :3]
+    assert np.allclose(rotation @ [1, 0, 0], [0, 1, 0], atol=1e-4)
+    assert np.allclose(b.world_com(), [1.0, 2.0, 3.0], atol=1e-4)
+
+    # Two overlapping spheres push each other apart, and a fixed one stays put.
+    c, d, ground = make_icosphere(1), make_icosphere(1), make_icosphere(1)
+    c.translate([-0.8, 0.0, 0.0])
+    d.translate([0.8, 0.0, 0.0])
+    ground.translate([0.0, 0.0, -1.5])
+    world = World({"c": c, "d": d, "ground": ground}, fixed=["ground"])
+    result = simulate(world, dt=dt, num_steps=5)
+    velocity = world.velocity.to_numpy()
+    assert velocity[0, 0] < 0 < velocity[1, 0]
+    assert np.isclose(velocity[0, 0], -velocity[1, 0], rtol=1e-3)
+    assert np.allclose(result["ground"][-1], result["ground"][0])
+    assert world.contact_cache.hits > 0
+
+    # Searching for contact candidates at every step gives the same motion.
+    c, d, ground = make_icosphere(1), make_icosphere(1), make_icosphere(1)
+    c.translate([-0.8, 0.0, 0.0])
+    d.translate([0.8, 0.0, 0.0])
+    ground.translate([0.0, 0.0, -1.5])
+    objects = {"c": c, "d": d, "ground": ground}
+    uncached = World(objects, fixed=["ground"], cache=False)
+    simulate(uncached, dt=dt, num_steps=5)
+    assert np.allclose(uncached.velocity.to_numpy(), velocity, atol=1e-5)
+
+
+def test_drop():
+    # The physics scene of the Julia version: a sphere dropped onto a fixed
+    # cube is stopped by the contact force, and bounces back up.
+    sphere, ground = make_icosphere(2), make_cube(10.0)
+    sphere.translate([0.0, 0.0, 2.0])
+    ground.translate([0.0, 0.0, -4.9])
+    objects = {"sphere": sphere, "ground": ground}
+    world = World(objects, fixed=["ground"], gravity=(0.0, 0.0, -9.8))
+    heights = simulate(world, dt=1e-3, num_steps=700)["sphere"][:, 2, 3]
+    # free fall would reach 2 - 9.8 * 0.7**2 / 2 = -0.4
+    assert heights.min() > 0.2
+    assert world.velocity.to_numpy()[0, 2] > 0
+
+
+test_simulate()
+test_drop()
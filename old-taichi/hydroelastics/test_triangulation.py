@@ -1,9 +1,15 @@
 import numpy as np
-from taichi import ti
 
-ti.init(arch=ti.cpu)
+from .runtime import init
 
-from .object import triangulate_polygon
+init(arch="cpu")
+
+from .object import (
+    integrate_pressure,
+    integrate_pressures,
+    triangulate_polygon,
+    triangulate_polygons,
+)
 
 
 def test_triangulation():
@@ -17,4 +23,31 @@ def test_triangulation():
     assert triangulate_polygon(polygon) == result
 
 
+def test_triangulation_batch():
+    # shuffled regular polygons of 3 to 8 vertices on random planes
+    rng = np.random.default_rng(0)
+    polygons = np.zeros((50, 8, 3))
+    counts = rng.integers(3, 9, size=50)
+    for k, count in enumerate(counts):
+        angles = rng.permutation(np.arange(count)) * 2 * np.pi / count
+        basis = np.linalg.qr(rng.normal(size=(3, 3)))[0]
+        circle = np.stack([np.cos(angles), np.sin(angles), np.zeros(count)], axis=1)
+        polygons[k, :count] = circle @ basis.T + rng.normal(size=3)
+    equations = rng.normal(size=(50, 4))
+
+    triangles, mask = triangulate_polygons(polygons, counts)
+    assert triangles.shape == (50, 6, 3)
+    areas, centroids, totals = integrate_pressures(polygons, counts, equations)
+    for k, count in enumerate(counts):
+        expected = triangulate_polygon(polygons[k, :count])
+        assert [tuple(t) for t in triangles[k][mask[k]].tolist()] == expected
+        area, centroid, total = integrate_pressure(polygons[k, :count], equations[k])
+        assert np.isclose(areas[k], area)
+        assert np.allclose(centroids[k], centroid)
+        assert np.isclose(totals[k], total)
+        # only a correct fan of a regular polygon has its exact area
+        assert np.isclose(area, count / 2 * np.sin(2 * np.pi / count))
+
+
 test_triangulation()
+test_triangulation_batch()